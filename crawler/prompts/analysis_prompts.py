@@ -12,9 +12,12 @@
 5. 硬件产品专用评判体系 (Hardware Dark Horse Index)
 """
 
-from typing import Optional
+import functools
+from typing import Optional, Tuple
 from urllib.parse import urlparse
 
+from utils.json_io import dumps_json_text
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 产品分析 Prompt (从搜索结果提取产品)
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -312,6 +315,35 @@ SCORING_PROMPT = """评估以下 AI 产品的"黑马指数"(1-5分)：
 ```"""
 
 
+SCORING_BATCH_PROMPT = """逐个评估以下 AI 产品的"黑马指数"(1-5分)：
+
+## 产品列表（JSON 数组）
+{products}
+
+## 评分标准
+
+| 分数 | 标准 |
+|------|------|
+| **5分** | 融资 >$100M 或 顶级创始人 (前 OpenAI/Google 高管) 或 品类开创者 或 ARR >$50M |
+| **4分** | 融资 >$30M 或 YC/a16z 投资 或 估值增长 >3x 或 ARR >$10M |
+| **3分** | 融资 $5M-$30M 或 ProductHunt Top 5 或 本地市场热度高 |
+| **2分** | 有创新点但数据不足 或 早期产品有潜力 |
+| **1分** | 边缘产品 或 待验证 或 信息太少 |
+
+## 返回格式（仅 JSON 数组，与输入一一对应，name 原样复制）
+
+```json
+[
+  {{
+    "name": "产品名",
+    "dark_horse_index": 4,
+    "criteria_met": ["funding_signal"],
+    "reason": "评分理由（具体说明依据）"
+  }}
+]
+```"""
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 翻译/本地化 Prompt
 # ─────────────────────────────────────────────────────────────────────────────
@@ -343,6 +375,17 @@ Requirements:
 # Prompt 选择器
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# 地区标识映射（未传 region_flag 时使用）
+REGION_FLAGS = {
+    "us": "🇺🇸",
+    "cn": "🇨🇳",
+    "eu": "🇪🇺",
+    "jp": "🇯🇵",
+    "kr": "🇰🇷",
+    "sea": "🇸🇬",
+}
+
+
 def get_analysis_prompt(
     region_key: str,
     search_results: str,
@@ -369,17 +412,7 @@ def get_analysis_prompt(
     else:
         template = ANALYSIS_PROMPT_EN
     
-    # 地区标识映射
-    region_flags = {
-        "us": "🇺🇸",
-        "cn": "🇨🇳",
-        "eu": "🇪🇺",
-        "jp": "🇯🇵",
-        "kr": "🇰🇷",
-        "sea": "🇸🇬",
-    }
-    
-    region = region_flag or region_flags.get(region_key, "🌍")
+    region = region_flag or REGION_FLAGS.get(region_key, "🌍")
     
     # 填充模板
     return template.format(
@@ -400,10 +433,20 @@ def get_scoring_prompt(product: dict) -> str:
     Returns:
         填充后的 prompt
     """
-    import json
-    return SCORING_PROMPT.format(
-        product=json.dumps(product, ensure_ascii=False, indent=2)
-    )
+    return SCORING_PROMPT.format(product=dumps_json_text(product))
+
+
+def get_scoring_batch_prompt(products: list) -> str:
+    """
+    获取批量评分 Prompt（一次请求评多个产品）
+
+    Args:
+        products: 产品信息字典列表
+
+    Returns:
+        填充后的 prompt
+    """
+    return SCORING_BATCH_PROMPT.format(products=dumps_json_text(products))
 
 
 def get_translation_prompt(content: str) -> str:
@@ -628,6 +671,71 @@ HARDWARE_SCORING_CRITERIA = """
 **热度类**：social_buzz, media_coverage, viral
 """
 
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 拆分为 system + user 消息（利用 provider 的前缀缓存）
+# ─────────────────────────────────────────────────────────────────────────────
+
+_SEARCH_SECTION_MARKERS = (
+    "## Search Results\n{search_results}\n\n---\n\n",
+    "## 搜索结果\n{search_results}\n\n---\n\n",
+)
+_QUOTA_SECTION_MARKERS = ("## Current Quota", "## 当前配额")
+
+
+@functools.lru_cache(maxsize=16)
+def split_prompt_template(template: str) -> Tuple[str, str]:
+    """
+    把抽取模板拆成 (静态规则, 动态部分) 两个模板
+
+    provider 的 prompt 缓存只命中「相同前缀」，而原模板把搜索结果放在开头、
+    配额放在结尾。这里把搜索结果段和配额段挪到 user 模板，规则/排除名单/JSON
+    schema 留在 system 模板，同一地区的每次请求 system 完全相同。
+    找不到标记时返回 ("", template)，调用方按单条消息发送。
+    """
+    search_marker = next((m for m in _SEARCH_SECTION_MARKERS if m in template), None)
+    quota_marker = next((m for m in _QUOTA_SECTION_MARKERS if m in template), None)
+    if not search_marker or not quota_marker:
+        return "", template
+
+    search_heading = search_marker.split("\n", 1)[0]
+    static = template.replace(search_marker, "", 1)
+    static, quota_section = static.split(quota_marker, 1)
+    static = static.rstrip().rstrip("-").rstrip()
+    dynamic = f"{search_heading}\n{{search_results}}\n\n---\n\n{quota_marker}{quota_section}"
+    return static, dynamic
+
+
+@functools.lru_cache(maxsize=32)
+def _render_system_prompt(template: str, region: str) -> str:
+    """system 部分只依赖模板和地区，渲染一次后复用（每次请求字节级一致）"""
+    static, _ = split_prompt_template(template)
+    return static.format(region=region, hardware_scoring=HARDWARE_SCORING_CRITERIA)
+
+
+def get_analysis_messages(
+    region_key: str,
+    search_results: str,
+    quota_dark_horses: int = 5,
+    quota_rising_stars: int = 10,
+    region_flag: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    获取分析 Prompt 的 (system, user) 两段，参数同 get_analysis_prompt
+
+    Returns:
+        (静态规则 system prompt, 含搜索结果和配额的 user prompt)
+    """
+    template = ANALYSIS_PROMPT_CN if region_key == "cn" else ANALYSIS_PROMPT_EN
+    region = region_flag or REGION_FLAGS.get(region_key, "🌍")
+    _, dynamic = split_prompt_template(template)
+    return _render_system_prompt(template, region), dynamic.format(
+        search_results=search_results[:15000],
+        quota_dark_horses=quota_dark_horses,
+        quota_rising_stars=quota_rising_stars,
+    )
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 硬件产品分析 Prompt
 # ─────────────────────────────────────────────────────────────────────────────
@@ -770,6 +878,21 @@ def get_hardware_analysis_prompt(
     )
 
 
+def get_hardware_analysis_messages(
+    search_results: str,
+    region: str = "🌍",
+    quota_dark_horses: int = 5,
+    quota_rising_stars: int = 10,
+) -> Tuple[str, str]:
+    """硬件分析 Prompt 的 (system, user) 两段，参数同 get_hardware_analysis_prompt"""
+    _, dynamic = split_prompt_template(HARDWARE_ANALYSIS_PROMPT)
+    return _render_system_prompt(HARDWARE_ANALYSIS_PROMPT, region), dynamic.format(
+        search_results=search_results[:15000],
+        quota_dark_horses=quota_dark_horses,
+        quota_rising_stars=quota_rising_stars,
+    )
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 硬件产品验证规则
 # ─────────────────────────────────────────────────────────────────────────────
@@ -946,10 +1069,14 @@ __all__ = [
     "ANALYSIS_PROMPT_EN",
     "ANALYSIS_PROMPT_CN",
     "SCORING_PROMPT",
+    "SCORING_BATCH_PROMPT",
     "TRANSLATION_PROMPT",
     "TRANSLATION_TO_EN_PROMPT",
     "get_analysis_prompt",
+    "get_analysis_messages",
+    "split_prompt_template",
     "get_scoring_prompt",
+    "get_scoring_batch_prompt",
     "get_translation_prompt",
     "get_translation_to_en_prompt",
     "WELL_KNOWN_PRODUCTS",
@@ -959,6 +1086,7 @@ __all__ = [
     "HARDWARE_SCORING_CRITERIA",
     "HARDWARE_ANALYSIS_PROMPT",
     "get_hardware_analysis_prompt",
+    "get_hardware_analysis_messages",
     "WELL_KNOWN_HARDWARE",
     "HARDWARE_CRITERIA",
     "validate_hardware_product",
@@ -19,12 +19,17 @@ import json
 import os
 import sys
 import argparse
+import functools
 import re
 import requests
+import queue
+import threading
 import time
-from datetime import datetime
-from urllib.parse import urlparse
-from typing import Any, Dict, Optional, Tuple, List
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlparse
+from typing import Any, Dict, FrozenSet, Optional, Tuple, List
 
 # 添加父目录到路径（用于导入 utils）
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -43,6 +48,32 @@ try:
 except ImportError:
     HAS_WEBSITE_RESOLVER = False
 
+try:
+    from utils.seen_url_cache import open_seen_url_cache
+    HAS_SEEN_URL_CACHE = True
+except ImportError:
+    HAS_SEEN_URL_CACHE = False
+
+try:
+    from utils.llm_response_cache import LlmResponseCache, open_llm_response_cache
+    HAS_LLM_RESPONSE_CACHE = True
+except ImportError:
+    HAS_LLM_RESPONSE_CACHE = False
+
+try:
+    from utils.http_session import build_pooled_session
+    HAS_HTTP_SESSION = True
+except ImportError:
+    HAS_HTTP_SESSION = False
+
+from utils.json_io import dump_json_file, dumps_json_text, load_json_file
+
+try:
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
 # 加载 .env 文件（如果存在）
 try:
     from dotenv import load_dotenv
@@ -64,6 +95,12 @@ GLM_MODEL = os.environ.get('GLM_MODEL', 'glm-4.7')  # 最新: glm-4.7 (200K cont
 GLM_SEARCH_ENGINE = os.environ.get('GLM_SEARCH_ENGINE', 'search_pro')
 USE_GLM_FOR_CN = os.environ.get('USE_GLM_FOR_CN', 'true').lower() == 'true'
 
+# 导入时确定各 provider 是否可用，缺 key 的地区直接跳过，不再发注定失败的请求
+PROVIDER_AVAILABLE = {
+    'perplexity': bool(PERPLEXITY_API_KEY),
+    'glm': bool(ZHIPU_API_KEY),
+}
+
 # Demand signals (HN + X)
 ENABLE_DEMAND_SIGNALS = os.environ.get('ENABLE_DEMAND_SIGNALS', 'true').lower() == 'true'
 DEMAND_WINDOW_DAYS = int(os.environ.get('DEMAND_WINDOW_DAYS', '7'))
@@ -214,11 +251,18 @@ COUNTRY_BY_CC_TLD = {
 }
 
 
+# 热路径正则（每个产品都会调用，模块加载时预编译）
+_REGION_FLAG_RE = re.compile(r"[\U0001F1E6-\U0001F1FF]{2}")
+_COUNTRY_SEPARATOR_RE = re.compile(r"[_\-.]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_WWW_PREFIX_RE = re.compile(r"^www\.", re.I)
+
+
 def _extract_region_flag(value: Any) -> str:
     text = str(value or "").strip()
     if not text:
         return ""
-    match = re.search(r"[\U0001F1E6-\U0001F1FF]{2}", text)
+    match = _REGION_FLAG_RE.search(text)
     return match.group(0) if match else ""
 
 
@@ -235,8 +279,8 @@ def _normalize_country_code(value: Any) -> str:
     if flag and flag in FLAG_TO_COUNTRY_CODE:
         return FLAG_TO_COUNTRY_CODE[flag]
 
-    normalized = re.sub(r"[_\-.]+", " ", text.lower()).strip()
-    normalized = re.sub(r"\s+", " ", normalized)
+    normalized = _COUNTRY_SEPARATOR_RE.sub(" ", text.lower()).strip()
+    normalized = _WHITESPACE_RE.sub(" ", normalized)
     return COUNTRY_NAME_ALIASES.get(normalized, "")
 
 
@@ -396,6 +440,8 @@ MAX_KEYWORDS_DEFAULT = int(os.environ.get('AUTO_DISCOVER_MAX_KEYWORDS', '0'))  #
 AUTO_DISCOVER_CN_BYPASS_ANALYZE_GATE = os.environ.get('AUTO_DISCOVER_CN_BYPASS_ANALYZE_GATE', 'true').lower() == 'true'
 AUTO_DISCOVER_WEBSITE_RECOVERY = os.environ.get('AUTO_DISCOVER_WEBSITE_RECOVERY', 'true').lower() == 'true'
 AUTO_DISCOVER_WEBSITE_RECOVERY_TIMEOUT = max(3, int(os.environ.get('AUTO_DISCOVER_WEBSITE_RECOVERY_TIMEOUT', '8')))
+# 非 TTY（cron / CI / Docker 的 PYTHONUNBUFFERED=1）时改为块缓冲输出，避免每个 print 一次 write(2)
+AUTO_DISCOVER_BUFFERED_OUTPUT = os.environ.get('AUTO_DISCOVER_BUFFERED_OUTPUT', 'true').lower() == 'true'
 
 # 成本优化配置
 AUTO_DISCOVER_BUDGET_MODE = os.environ.get('AUTO_DISCOVER_BUDGET_MODE', 'adaptive').strip().lower()
@@ -403,10 +449,31 @@ if AUTO_DISCOVER_BUDGET_MODE not in {'adaptive', 'legacy'}:
     AUTO_DISCOVER_BUDGET_MODE = 'adaptive'
 AUTO_DISCOVER_ROUND1_KEYWORDS = max(1, int(os.environ.get('AUTO_DISCOVER_ROUND1_KEYWORDS', '2')))
 AUTO_DISCOVER_ROUND_EXPAND_STEP = max(1, int(os.environ.get('AUTO_DISCOVER_ROUND_EXPAND_STEP', '2')))
+AUTO_DISCOVER_KEYWORD_ORDER = os.environ.get('AUTO_DISCOVER_KEYWORD_ORDER', 'yield').strip().lower()  # yield/profit_per_cost
+AUTO_DISCOVER_PRUNE_MIN_SEARCHES = max(0, int(os.environ.get('AUTO_DISCOVER_PRUNE_MIN_SEARCHES', '5')))  # 0=不剪枝
+AUTO_DISCOVER_PRUNE_DAYS = max(1, int(os.environ.get('AUTO_DISCOVER_PRUNE_DAYS', '7')))
+AUTO_DISCOVER_PRUNE_KEEP_MIN = max(1, int(os.environ.get('AUTO_DISCOVER_PRUNE_KEEP_MIN', '2')))
 AUTO_DISCOVER_ENABLE_ANALYZE_GATE = os.environ.get('AUTO_DISCOVER_ENABLE_ANALYZE_GATE', 'true').lower() == 'true'
 AUTO_DISCOVER_QUALITY_FALLBACK = os.environ.get('AUTO_DISCOVER_QUALITY_FALLBACK', 'true').lower() == 'true'
 AUTO_DISCOVER_PROMPT_MAX_CHARS = max(1200, int(os.environ.get('AUTO_DISCOVER_PROMPT_MAX_CHARS', '6000')))
 AUTO_DISCOVER_RESULT_SNIPPET_MAX_CHARS = max(120, int(os.environ.get('AUTO_DISCOVER_RESULT_SNIPPET_MAX_CHARS', '320')))
+AUTO_DISCOVER_MAX_SNIPPETS_PER_KEYWORD = max(1, int(os.environ.get('AUTO_DISCOVER_MAX_SNIPPETS_PER_KEYWORD', '10')))
+AUTO_DISCOVER_NEAR_DUP_THRESHOLD = float(os.environ.get('AUTO_DISCOVER_NEAR_DUP_THRESHOLD', '0.9'))  # <=0 关闭
+AUTO_DISCOVER_NEAR_DUP_WINDOW = max(1, int(os.environ.get('AUTO_DISCOVER_NEAR_DUP_WINDOW', '32')))
+AUTO_DISCOVER_REGION_WORKERS = max(0, int(os.environ.get('AUTO_DISCOVER_REGION_WORKERS', '0')))  # 0=每个地区一个线程, 1=地区串行
+AUTO_DISCOVER_KEYWORD_WORKERS = max(1, int(os.environ.get('AUTO_DISCOVER_KEYWORD_WORKERS', '2')))  # 地区内关键词并发抽取（GLM 除外），1=串行
+AUTO_DISCOVER_URL_CHECK_WORKERS = max(1, int(os.environ.get('AUTO_DISCOVER_URL_CHECK_WORKERS', '8')))  # 官网可访问性并发校验，1=串行
+AUTO_DISCOVER_SEARCH_BATCH_SIZE = min(5, max(1, int(os.environ.get('AUTO_DISCOVER_SEARCH_BATCH_SIZE', '5'))))  # Perplexity 多查询搜索，1=关闭
+AUTO_DISCOVER_BATCH_EXTRACT_SIZE = max(1, int(os.environ.get('AUTO_DISCOVER_BATCH_EXTRACT_SIZE', '1')))  # 1=逐关键词抽取
+AUTO_DISCOVER_SCORE_BATCH_SIZE = max(1, int(os.environ.get('AUTO_DISCOVER_SCORE_BATCH_SIZE', '10')))  # 一次评分请求的产品数，1=逐个评分
+AUTO_DISCOVER_EXTRACT_MAX_TOKENS = max(256, int(os.environ.get('AUTO_DISCOVER_EXTRACT_MAX_TOKENS', '4096')))  # 抽取输出多产品完整字段，截断会丢整段 JSON
+AUTO_DISCOVER_SCORE_MAX_TOKENS = max(64, int(os.environ.get('AUTO_DISCOVER_SCORE_MAX_TOKENS', '300')))  # 单个产品评分输出上限
+AUTO_DISCOVER_SEEN_URL_CACHE = os.environ.get('AUTO_DISCOVER_SEEN_URL_CACHE', 'true').lower() == 'true'  # 跨运行跳过已抽取过的搜索结果
+AUTO_DISCOVER_SEEN_URL_TTL_DAYS = max(0, int(os.environ.get('AUTO_DISCOVER_SEEN_URL_TTL_DAYS', '30')))
+AUTO_DISCOVER_SEARCH_MAX_PAGES = max(1, int(os.environ.get('AUTO_DISCOVER_SEARCH_MAX_PAGES', '2')))  # 新结果不足时加深搜索，1=关闭
+AUTO_DISCOVER_MIN_FRESH_RESULTS = max(1, int(os.environ.get('AUTO_DISCOVER_MIN_FRESH_RESULTS', '3')))
+AUTO_DISCOVER_LLM_CACHE = os.environ.get('AUTO_DISCOVER_LLM_CACHE', 'true').lower() == 'true'  # 相同 prompt 复用上次的抽取/评分结果
+AUTO_DISCOVER_LLM_CACHE_TTL_DAYS = max(0, int(os.environ.get('AUTO_DISCOVER_LLM_CACHE_TTL_DAYS', '7')))
 
 # ============================================
 # 多语言关键词库（原生语言搜索效果更好）
@@ -585,37 +652,38 @@ def get_keywords_for_today(region: str, product_type: str = "mixed") -> list:
     - mixed 模式下硬件:软件 = 40%:60%
     - 每天轮换不同的关键词组合
     """
-    day = datetime.now().weekday()
+    pool = _keyword_pool_for_day(region, product_type, datetime.now().weekday())
+    # 随机打乱顺序
+    return random.sample(pool, len(pool))
 
+
+@functools.lru_cache(maxsize=128)
+def _keyword_pool_for_day(region: str, product_type: str, day: int) -> Tuple[str, ...]:
+    """(地区, 类型, 星期几) → 当天的关键词池；关键词表是静态的，每个组合只算一次"""
     if product_type == "hardware":
         # 只返回硬件关键词
-        keywords = KEYWORDS_HARDWARE.get(region, KEYWORDS_HARDWARE["us"])
-    elif product_type == "software":
+        return tuple(KEYWORDS_HARDWARE.get(region, KEYWORDS_HARDWARE["us"]))
+    if product_type == "software":
         # 只返回软件关键词
-        keywords = KEYWORDS_SOFTWARE.get(region, KEYWORDS_SOFTWARE["us"])
-    else:
-        # mixed 模式：40% 硬件 + 60% 软件
-        hw_keywords = KEYWORDS_HARDWARE.get(region, KEYWORDS_HARDWARE["us"])
-        sw_keywords = KEYWORDS_SOFTWARE.get(region, KEYWORDS_SOFTWARE["us"])
-        site_searches = SITE_SEARCHES.get(region, [])
-        
-        # 计算数量：硬件 40%，软件 60%
-        hw_count = max(2, len(hw_keywords) * 2 // 5)  # 至少 2 个硬件关键词
-        sw_count = max(3, len(sw_keywords) * 3 // 5)  # 至少 3 个软件关键词
-        
-        # 根据星期几轮换
-        hw_start = (day * 2) % max(1, len(hw_keywords))
-        sw_start = (day * 2) % max(1, len(sw_keywords))
-        
-        hw_selected = (hw_keywords[hw_start:] + hw_keywords[:hw_start])[:hw_count]
-        sw_selected = (sw_keywords[sw_start:] + sw_keywords[:sw_start])[:sw_count]
-        
-        keywords = hw_selected + sw_selected + site_searches[:1]
+        return tuple(KEYWORDS_SOFTWARE.get(region, KEYWORDS_SOFTWARE["us"]))
 
-    # 随机打乱顺序
-    shuffled = keywords.copy()
-    random.shuffle(shuffled)
-    return shuffled
+    # mixed 模式：40% 硬件 + 60% 软件
+    hw_keywords = KEYWORDS_HARDWARE.get(region, KEYWORDS_HARDWARE["us"])
+    sw_keywords = KEYWORDS_SOFTWARE.get(region, KEYWORDS_SOFTWARE["us"])
+    site_searches = SITE_SEARCHES.get(region, [])
+
+    # 计算数量：硬件 40%，软件 60%
+    hw_count = max(2, len(hw_keywords) * 2 // 5)  # 至少 2 个硬件关键词
+    sw_count = max(3, len(sw_keywords) * 3 // 5)  # 至少 3 个软件关键词
+
+    # 根据星期几轮换
+    hw_start = (day * 2) % max(1, len(hw_keywords))
+    sw_start = (day * 2) % max(1, len(sw_keywords))
+
+    hw_selected = (hw_keywords[hw_start:] + hw_keywords[:hw_start])[:hw_count]
+    sw_selected = (sw_keywords[sw_start:] + sw_keywords[:sw_start])[:sw_count]
+
+    return tuple(hw_selected + sw_selected + site_searches[:1])
 
 
 def get_hardware_keywords(region: str) -> list:
@@ -623,25 +691,33 @@ def get_hardware_keywords(region: str) -> list:
     return KEYWORDS_HARDWARE.get(region, KEYWORDS_HARDWARE["us"])
 
 
+_HARDWARE_QUERY_TERMS = (
+    "hardware", "robot", "robotics", "chip", "semiconductor", "wearable",
+    "glasses", "ring", "pendant", "device", "gadget", "embodied", "edge",
+    "smart glasses", "kickstarter", "indiegogo", "crowdfunding",
+    "硬件", "机器人", "人形机器人", "芯片", "半导体", "具身智能", "智能眼镜",
+    "可穿戴", "吊坠", "戒指", "设备", "众筹",
+)
+
+
 def is_hardware_query_text(query: str) -> bool:
     """基于关键词判断是否为硬件查询（混合模式路由用）"""
     q = query.lower()
-    hardware_terms = [
-        "hardware", "robot", "robotics", "chip", "semiconductor", "wearable",
-        "glasses", "ring", "pendant", "device", "gadget", "embodied", "edge",
-        "smart glasses", "kickstarter", "indiegogo", "crowdfunding",
-        "硬件", "机器人", "人形机器人", "芯片", "半导体", "具身智能", "智能眼镜",
-        "可穿戴", "吊坠", "戒指", "设备", "众筹",
-    ]
-    return any(term in q for term in hardware_terms)
+    return any(term in q for term in _HARDWARE_QUERY_TERMS)
+
 
+@functools.lru_cache(maxsize=16)
+def _hardware_keyword_set(region: str) -> frozenset:
+    """地区硬件关键词集合（关键词表是常量，按地区缓存）"""
+    return frozenset(get_hardware_keywords(region))
 
+
+@functools.lru_cache(maxsize=1024)
 def resolve_keyword_type(keyword: str, region_key: str, product_type: str) -> str:
-    """混合模式下按关键词路由硬件/软件 prompt"""
+    """混合模式下按关键词路由硬件/软件 prompt（纯函数，结果缓存）"""
     if product_type != "mixed":
         return product_type
-    hw_keywords = set(get_hardware_keywords(region_key))
-    if keyword in hw_keywords or is_hardware_query_text(keyword):
+    if keyword in _hardware_keyword_set(region_key) or is_hardware_query_text(keyword):
         return "hardware"
     return "software"
 
@@ -650,10 +726,16 @@ def get_software_keywords(region: str) -> list:
     return KEYWORDS_SOFTWARE.get(region, KEYWORDS_SOFTWARE["us"])
 
 def get_region_order() -> list:
-    """随机化地区搜索顺序，避免固定偏差"""
-    regions = list(REGION_CONFIG.keys())
-    random.shuffle(regions)
-    return regions
+    """
+    按 weight 加权随机排列地区顺序（配额提前满时，高权重地区更可能先被搜索）
+
+    加权无放回抽样（Efraimidis-Spirakis）：每个地区取 random() ** (1 / weight) 降序排列。
+    """
+    return sorted(
+        _REGION_KEYS,
+        key=lambda k: random.random() ** _REGION_INV_WEIGHTS[k],
+        reverse=True,
+    )
 
 # ============================================
 # 地区配置 (按比例分配搜索任务)
@@ -713,6 +795,16 @@ REGION_CONFIG = {
     },
 }
 
+# 地区代码 → 产品 source_region 标识（jp/kr 合并展示为日韩）
+REGION_FLAG_MAP = {
+    'us': '🇺🇸', 'cn': '🇨🇳', 'eu': '🇪🇺',
+    'jp': '🇯🇵🇰🇷', 'kr': '🇰🇷', 'sea': '🇸🇬'
+}
+
+# 地区顺序抽样用：键元组和 1/weight 只在导入时算一次
+_REGION_KEYS = tuple(REGION_CONFIG)
+_REGION_INV_WEIGHTS = {k: 1.0 / max(1, REGION_CONFIG[k].get('weight', 1)) for k in _REGION_KEYS}
+
 CN_PRIORITY_KEYWORDS = [
     "site:36kr.com AI融资",
     "site:jiqizhixin.com 融资 AI",
@@ -733,13 +825,24 @@ AUTO_DISCOVER_LOCK_FILE = os.environ.get(
     os.path.join(PROJECT_ROOT, 'logs', 'auto_discover.lock')
 )
 KEYWORD_YIELD_STATS_FILE = os.path.join(PROJECT_ROOT, 'data', 'metrics', 'keyword_yield_stats.json')
+AUTO_DISCOVER_SEEN_URL_DB = os.environ.get(
+    'AUTO_DISCOVER_SEEN_URL_DB',
+    os.path.join(PROJECT_ROOT, 'data', 'cache', 'seen_urls.sqlite')
+)
+AUTO_DISCOVER_LLM_CACHE_DB = os.environ.get(
+    'AUTO_DISCOVER_LLM_CACHE_DB',
+    os.path.join(PROJECT_ROOT, 'data', 'cache', 'llm_responses.sqlite')
+)
 
-try:
-    from utils.demand_signals import DemandSignalEngine, apply_demand_guardrail
-    HAS_DEMAND_SIGNALS = True
-except Exception as e:
-    HAS_DEMAND_SIGNALS = False
-    print(f"⚠️ demand_signals module not available: {e}")
+@functools.lru_cache(maxsize=1)
+def load_demand_signals():
+    """按需导入 demand_signals（只有发现流程用到，--list-*/--test-* 等命令不加载）"""
+    try:
+        from utils import demand_signals
+        return demand_signals
+    except Exception as e:
+        print(f"⚠️ demand_signals module not available: {e}")
+        return None
 
 
 def apply_keyword_limit(region_key: str, keywords: List[str]) -> List[str]:
@@ -766,9 +869,14 @@ def apply_keyword_limit(region_key: str, keywords: List[str]) -> List[str]:
     return keywords
 
 
-def build_search_text(search_results: List[dict], snippet_limit: int = AUTO_DISCOVER_RESULT_SNIPPET_MAX_CHARS) -> str:
+def build_search_text(
+    search_results: List[dict],
+    snippet_limit: int = AUTO_DISCOVER_RESULT_SNIPPET_MAX_CHARS,
+    max_results: int = AUTO_DISCOVER_MAX_SNIPPETS_PER_KEYWORD,
+) -> str:
+    # 排名靠后的结果几乎不贡献信号，只取前 max_results 条以节省 prompt token
     blocks = []
-    for r in search_results:
+    for r in search_results[:max_results]:
         title = str(r.get('title', 'No Title') or 'No Title').strip()
         url = str(r.get('url', 'N/A') or 'N/A').strip()
         date_text = str(r.get('date', '') or '').strip()
@@ -782,6 +890,45 @@ def build_search_text(search_results: List[dict], snippet_limit: int = AUTO_DISC
     return "\n\n".join(blocks)
 
 
+def build_batch_search_text(blocks: List[Tuple[str, str]]) -> str:
+    """把多个关键词的 search_text 拼成一次抽取的输入（按 Block 分段）"""
+    parts = []
+    for idx, (keyword, search_text) in enumerate(blocks, 1):
+        parts.append(f"## Block {idx} (keyword={keyword})\n{search_text}")
+    return "\n\n".join(parts)
+
+
+_SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+
+def search_text_signature(search_text: str, shingle_size: int = 3) -> frozenset:
+    """search_text 的词级 shingle 集合（用于近重复检测，代替 MinHash）"""
+    tokens = _SEARCH_TOKEN_RE.findall(str(search_text or "").lower())
+    if len(tokens) < shingle_size:
+        return frozenset(tokens)
+    return frozenset(
+        hash(tuple(tokens[i:i + shingle_size]))
+        for i in range(len(tokens) - shingle_size + 1)
+    )
+
+
+def find_near_duplicate_search_text(
+    signature: frozenset,
+    recent: deque,
+    threshold: float = AUTO_DISCOVER_NEAR_DUP_THRESHOLD,
+) -> str:
+    """在最近处理过的 search_text 中查找近重复，返回命中的关键词（无则返回空串）"""
+    if threshold <= 0 or not signature:
+        return ""
+    for prev_signature, prev_keyword in recent:
+        if not prev_signature:
+            continue
+        union = len(signature | prev_signature)
+        if union and len(signature & prev_signature) / union >= threshold:
+            return prev_keyword
+    return ""
+
+
 def _extract_domain_from_result(result: dict) -> str:
     raw_url = str(result.get("url", "") or "").strip()
     if not raw_url:
@@ -825,8 +972,7 @@ def _safe_load_json_dict(path: str) -> Dict[str, Any]:
     if not path or not os.path.exists(path):
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = load_json_file(path)
         if isinstance(data, dict):
             return data
     except Exception:
@@ -836,8 +982,7 @@ def _safe_load_json_dict(path: str) -> Dict[str, Any]:
 
 def _safe_save_json_dict(path: str, payload: Dict[str, Any]) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    dump_json_file(path, payload)
 
 
 def load_keyword_yield_stats() -> Dict[str, Any]:
@@ -879,6 +1024,76 @@ def rank_keywords_by_yield(region_key: str, keywords: List[str], stats: Dict[str
     return [row[3] for row in scored]
 
 
+def rank_keywords_by_profit(region_key: str, keywords: List[str], stats: Dict[str, Any]) -> List[str]:
+    """
+    按单次搜索收益 (saved / searches) 降序排列关键词
+
+    没有历史记录的关键词取本地区已有关键词的平均收益，避免新词永远排在最后。
+    排序稳定：收益相同时保留传入顺序（通常是 rank_keywords_by_yield 的结果）。
+    """
+    if not keywords:
+        return []
+    region_stats = (stats.get("keywords") or {}).get(region_key, {})
+    if not isinstance(region_stats, dict):
+        return list(keywords)
+
+    profits: Dict[str, float] = {}
+    for keyword in keywords:
+        row = region_stats.get(keyword)
+        if not isinstance(row, dict):
+            continue
+        searches = int(row.get("searches", 0) or 0)
+        if searches <= 0:
+            continue
+        profits[keyword] = int(row.get("saved", 0) or 0) / searches
+
+    prior = (sum(profits.values()) / len(profits)) if profits else 0.0
+    return sorted(keywords, key=lambda kw: profits.get(kw, prior), reverse=True)
+
+
+def prune_low_yield_keywords(region_key: str, keywords: List[str], stats: Dict[str, Any]) -> List[str]:
+    """
+    跳过历史上只产出重复/被拒的关键词（searches 足够多但 saved=0）
+
+    跳过状态写回 keyword_yield_stats（skip_until），到期后放行一次重新探测；
+    仍然零产出会再次跳过。每个地区至少保留 AUTO_DISCOVER_PRUNE_KEEP_MIN 个关键词。
+    """
+    if AUTO_DISCOVER_PRUNE_MIN_SEARCHES <= 0 or len(keywords) <= AUTO_DISCOVER_PRUNE_KEEP_MIN:
+        return list(keywords)
+    region_stats = (stats.get("keywords") or {}).get(region_key, {})
+    if not isinstance(region_stats, dict):
+        return list(keywords)
+
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    kept: List[str] = []
+    pruned: List[str] = []
+    for keyword in keywords:
+        row = region_stats.get(keyword)
+        if (
+            isinstance(row, dict)
+            and int(row.get("searches", 0) or 0) >= AUTO_DISCOVER_PRUNE_MIN_SEARCHES
+            and int(row.get("saved", 0) or 0) == 0
+        ):
+            skip_until = str(row.get("skip_until") or "")
+            if not skip_until:
+                row["skip_until"] = (datetime.utcnow() + timedelta(days=AUTO_DISCOVER_PRUNE_DAYS)).strftime("%Y-%m-%d")
+                pruned.append(keyword)
+                continue
+            if skip_until > today:
+                pruned.append(keyword)
+                continue
+            # 到期：本次放行探测，下次仍零产出再重新计时
+            row.pop("skip_until", None)
+        kept.append(keyword)
+
+    # 保底：按原顺序补回被剪掉的关键词
+    while len(kept) < AUTO_DISCOVER_PRUNE_KEEP_MIN and pruned:
+        kept.append(pruned.pop(0))
+    if pruned:
+        print(f"  ✂️ {region_key}: skipping {len(pruned)} zero-yield keywords until re-probe")
+    return kept
+
+
 def update_keyword_yield_stats(
     stats: Dict[str, Any],
     *,
@@ -936,9 +1151,10 @@ try:
         ANALYSIS_PROMPT_EN,
         ANALYSIS_PROMPT_CN,
         SCORING_PROMPT,
-        get_analysis_prompt,
         get_scoring_prompt,
-        get_hardware_analysis_prompt,
+        get_scoring_batch_prompt,
+        get_analysis_messages,
+        get_hardware_analysis_messages,
         validate_hardware_product,
         WELL_KNOWN_PRODUCTS as PROMPT_WELL_KNOWN,
         GENERIC_WHY_MATTERS as PROMPT_GENERIC,
@@ -1078,8 +1294,12 @@ RISING_STARS_DIR = os.path.join(PROJECT_ROOT, 'data', 'rising_stars')
 CANDIDATES_DIR = os.path.join(PROJECT_ROOT, 'data', 'candidates')
 
 
+_process_lock_file = None
+
+
 def acquire_process_lock(lock_path: str):
     """单实例锁，避免并发运行导致 API 并发超限"""
+    global _process_lock_file
     try:
         import fcntl
     except ImportError:
@@ -1096,8 +1316,37 @@ def acquire_process_lock(lock_path: str):
 
     lock_file.write(f"{os.getpid()}\n{datetime.utcnow().isoformat()}Z\n")
     lock_file.flush()
+    _process_lock_file = lock_file
     return lock_file, True
 
+
+def release_process_lock() -> None:
+    """提前释放单实例锁（保存完成、只剩打印报告时调用；未持锁时无操作）"""
+    global _process_lock_file
+    lock_file = _process_lock_file
+    _process_lock_file = None
+    if lock_file is None:
+        return
+    try:
+        import fcntl
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    except (ImportError, OSError):
+        pass
+    lock_file.close()
+
+
+def configure_output_buffering() -> None:
+    """非交互运行时把 stdout 切成块缓冲（按轮/地区显式 flush）"""
+    if not AUTO_DISCOVER_BUFFERED_OUTPUT:
+        return
+    stream = sys.stdout
+    try:
+        if stream.isatty():
+            return
+        stream.reconfigure(line_buffering=False, write_through=False)
+    except (AttributeError, ValueError, OSError):
+        pass
+
 # 渠道配置
 SOURCES = {
     # 美国渠道
@@ -1207,45 +1456,91 @@ def get_current_week():
     return f"{now.year}_{now.isocalendar()[1]:02d}"
 
 
+def _existing_product_files() -> List[Tuple[str, int]]:
+    """黑马/潜力股目录下的周文件及其 mtime（mtime 作为解析缓存的失效条件）"""
+    files = []
+    for dir_path in (DARK_HORSES_DIR, RISING_STARS_DIR):
+        try:
+            with os.scandir(dir_path) as it:
+                entries = [
+                    entry for entry in it
+                    if entry.name.endswith('.json') and not entry.name.startswith('.')
+                ]
+        except OSError:
+            continue
+        for entry in sorted(entries, key=lambda e: e.name):
+            try:
+                if entry.is_file():
+                    files.append((entry.path, entry.stat().st_mtime_ns))
+            except OSError:
+                continue
+    return files
+
+
+@functools.lru_cache(maxsize=256)
+def _load_product_file_entries(path: str, mtime_ns: int) -> Tuple[Tuple[str, str], ...]:
+    """解析一个周文件，返回 (name, website) 元组；文件未变时直接复用上次结果"""
+    products = load_json_file(path)
+    return tuple((p.get('name', ''), p.get('website', '')) for p in products)
+
+
+@functools.lru_cache(maxsize=256)
+def _product_file_index(path: str, mtime_ns: int) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """一个周文件的 (查重 key 集合, 域名集合)，一次解析同时算出两者，文件未变时直接复用"""
+    keys = set()
+    domains = set()
+    for name, website in _load_product_file_entries(path, mtime_ns):
+        keys.add(name.lower())
+        keys.add(website.lower())
+        keys.update(fuzzy_duplicate_keys(name, website))
+        domain = normalize_url(website)
+        if domain:
+            domains.add(domain)
+    return frozenset(keys), frozenset(domains)
+
+
 def load_existing_products():
-    """加载所有已存在的产品名称和网址"""
+    """加载所有已存在的产品名称和网址（按文件 mtime 缓存解析结果，discover_all 多渠道不重复解析）"""
     existing = set()
+    for path, mtime_ns in _existing_product_files():
+        existing.update(_product_file_index(path, mtime_ns)[0])
+    return existing
 
-    # 加载黑马
-    if os.path.exists(DARK_HORSES_DIR):
-        for f in os.listdir(DARK_HORSES_DIR):
-            if f.endswith('.json'):
-                with open(os.path.join(DARK_HORSES_DIR, f), 'r') as file:
-                    products = json.load(file)
-                    for p in products:
-                        existing.add(p.get('name', '').lower())
-                        existing.add(p.get('website', '').lower())
-
-    # 加载潜力股
-    if os.path.exists(RISING_STARS_DIR):
-        for f in os.listdir(RISING_STARS_DIR):
-            if f.endswith('.json'):
-                with open(os.path.join(RISING_STARS_DIR, f), 'r') as file:
-                    products = json.load(file)
-                    for p in products:
-                        existing.add(p.get('name', '').lower())
-                        existing.add(p.get('website', '').lower())
 
-    return existing
+def fuzzy_duplicate_keys(name: str, website: str) -> List[str]:
+    """
+    模糊去重 key：规范化名称（去掉 AI/Inc/Labs 等后缀）+ 域名 key
+
+    "Harvey AI" / "Harvey" → "harvey"；"https://www.cursor.com" → "cursor.com"。
+    子路径保留第一级（"meta.com/orion"），同一大公司域名下的不同产品不会互相判重。
+    与精确 key 放在同一个 set 里，查重仍是 O(1)。
+    """
+    keys = []
+    if USE_NEW_DEDUP and name:
+        normalized = normalize_name(name)
+        if len(normalized) >= 3:
+            keys.append(normalized)
+    domain = get_domain_key(website) if website and website.lower() != 'unknown' else ""
+    if domain:
+        keys.append(domain)
+    return keys
 
 
 def is_duplicate(name: str, website: str, existing: set) -> bool:
     """
     检查是否重复（基础版本）
     
-    使用名称和网站的精确匹配
+    使用名称和网站的精确匹配，再查规范化名称/主域名
     """
-    return name.lower() in existing or website.lower() in existing
+    if name.lower() in existing or website.lower() in existing:
+        return True
+    return any(key in existing for key in fuzzy_duplicate_keys(name, website))
 
 
+@functools.lru_cache(maxsize=10000)
 def normalize_url(url: str) -> str:
     """
-    标准化 URL，提取主域名用于去重
+    标准化 URL，提取主域名用于去重（结果缓存，同域名产品很多）
 
     "https://www.example.com/page" → "example.com"
     """
@@ -1253,12 +1548,40 @@ def normalize_url(url: str) -> str:
         return ""
     try:
         parsed = urlparse(url)
-        domain = parsed.netloc.replace("www.", "")
-        return domain.lower()
-    except:
+        return _WWW_PREFIX_RE.sub("", parsed.netloc.lower())
+    except ValueError:  # 如畸形 IPv6 "http://[::1"
         return url.lower()
 
 
+_TRACKING_QUERY_KEYS = {"ref", "source", "fbclid", "gclid", "mc_cid", "mc_eid"}
+
+
+def normalize_result_url(url: str) -> str:
+    """
+    标准化搜索结果 URL（保留路径，去掉协议/www/跟踪参数/锚点），用于跨运行识别同一篇文章
+
+    "https://www.example.com/a/?utm_source=x#top" → "example.com/a"
+    """
+    if not url:
+        return ""
+    try:
+        parsed = urlparse(url.strip())
+    except Exception:
+        return url.strip().lower()
+    host = _WWW_PREFIX_RE.sub("", parsed.netloc.lower())
+    if not host:
+        return ""
+    path = parsed.path.rstrip("/")
+    query = [
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_QUERY_KEYS
+    ]
+    normalized = host + path
+    if query:
+        normalized += "?" + urlencode(sorted(query))
+    return normalized
+
+
 # ============================================
 # 增强去重检查器（使用新模块）
 # ============================================
@@ -1347,6 +1670,23 @@ class EnhancedDuplicateChecker:
                 self.existing_domains.add(domain)
 
 
+_url_check_session = None
+_url_check_session_lock = threading.Lock()
+
+
+def get_url_check_session() -> requests.Session:
+    """URL 校验共用的连接池 Session（校验失败即判不可访问，不做自动重试）"""
+    global _url_check_session
+    if _url_check_session is None:
+        with _url_check_session_lock:
+            if _url_check_session is None:
+                if HAS_HTTP_SESSION:
+                    _url_check_session = build_pooled_session(max_retries=0)
+                else:
+                    _url_check_session = requests.Session()
+    return _url_check_session
+
+
 def verify_url_exists(url: str, timeout: int = 5) -> bool:
     """
     验证 URL 是否真实存在（可访问）
@@ -1371,7 +1711,7 @@ def verify_url_exists(url: str, timeout: int = 5) -> bool:
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         
         # 发送 GET 请求（HEAD 有时被拒绝）
-        response = requests.get(
+        response = get_url_check_session().get(
             url,
             timeout=timeout,
             allow_redirects=True,
@@ -1385,6 +1725,36 @@ def verify_url_exists(url: str, timeout: int = 5) -> bool:
         return False
 
 
+def verify_urls_batch(urls: List[str], timeout: int = 5) -> Dict[str, bool]:
+    """并发校验一批 URL（重复 URL 只请求一次），返回 url → 是否可访问"""
+    unique = list(dict.fromkeys(url for url in urls if url))
+    if not unique:
+        return {}
+    workers = min(AUTO_DISCOVER_URL_CHECK_WORKERS, len(unique))
+    if workers <= 1:
+        return {url: verify_url_exists(url, timeout=timeout) for url in unique}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda url: verify_url_exists(url, timeout=timeout), unique)
+        return dict(zip(unique, results))
+
+
+def mark_unreachable_websites(products: List[dict], timeout: int = 5) -> int:
+    """批量校验产品官网，不可访问的标记 needs_verification，返回标记数量"""
+    websites = [product.get('website', '') or '' for product in products]
+    reachable = verify_urls_batch(
+        [website for website in websites if website and website.lower() != 'unknown'],
+        timeout=timeout,
+    )
+    marked = 0
+    for product, website in zip(products, websites):
+        if reachable.get(website, True):
+            continue
+        print(f"    ⚠️ URL not accessible: {website}")
+        product['needs_verification'] = True
+        marked += 1
+    return marked
+
+
 def is_duplicate_domain(product: dict, existing_domains: set) -> bool:
     """检查域名是否已存在"""
     domain = normalize_url(product.get("website", ""))
@@ -1471,6 +1841,54 @@ GENERIC_CONCEPT_NAMES = [
     "AI wearable", "AI device", "AI hardware", "smart glasses",
 ]
 
+# 新闻标题特征词（name 命中且较长时视为标题）
+NEWS_HEADLINE_MARKERS = [
+    '融资', '宣布', '发布', '获得', '完成', '推出', '上线',
+    '投资', '领投', '参投', '被投', '收购', '估值',
+    '独家', '爆料', '报道', '曝光', '传出', '消息', '传闻',
+]
+
+# why_matters 具体性关键词（没有数字时至少命中一个）
+WHY_MATTERS_SPECIFIC_MARKERS = [
+    '领投', '融资', '估值', '用户', '增长', 'ARR', '首创', '首个',
+    '前OpenAI', '前Google', '前Meta', 'YC', 'a16z', 'Sequoia',
+]
+
+
+def _compile_substring_re(terms, flags: int = 0) -> re.Pattern:
+    """把子串黑名单编译成一个交替正则（长词优先），一次 search 代替逐个 in 检查"""
+    ordered = sorted({t for t in terms if t}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(t) for t in ordered), flags)
+
+
+_UNTRUSTED_SOURCE_RE = _compile_substring_re(t.lower() for t in UNTRUSTED_SOURCES)
+_UNTRUSTED_SOURCE_DOMAIN_RE = _compile_substring_re(UNTRUSTED_SOURCE_DOMAINS)
+_BLOG_TITLE_MARKER_RE = _compile_substring_re(BLOG_TITLE_MARKERS)
+# 通用概念名前缀（str.startswith 接受元组，一次调用检查全部）
+_GENERIC_CONCEPTS_LOWER = tuple((c, c.lower()) for c in GENERIC_CONCEPT_NAMES)
+_GENERIC_CONCEPT_PREFIXES = tuple(p for _, p in _GENERIC_CONCEPTS_LOWER)
+_GENERIC_WHY_MATTERS_RE = _compile_substring_re(GENERIC_WHY_MATTERS)
+_NEWS_HEADLINE_RE = _compile_substring_re(NEWS_HEADLINE_MARKERS)
+_WHY_MATTERS_SPECIFIC_RE = _compile_substring_re(WHY_MATTERS_SPECIFIC_MARKERS)
+_WELL_KNOWN_RE = _compile_substring_re(WELL_KNOWN_PRODUCTS)
+# 反向部分匹配（名称是某个知名产品名的子串）：换行拼接后一次 in 检查
+_WELL_KNOWN_JOINED = "\n".join(sorted(WELL_KNOWN_PRODUCTS))
+
+
+def _match_well_known_product(name_lower: str) -> Optional[str]:
+    """返回与名称部分匹配的知名产品（名称包含它，或它包含名称），没有返回 None"""
+    match = _WELL_KNOWN_RE.search(name_lower)
+    if match:
+        return match.group()
+    if "\n" in name_lower:
+        return None
+    idx = _WELL_KNOWN_JOINED.find(name_lower)
+    if idx < 0:
+        return None
+    start = _WELL_KNOWN_JOINED.rfind("\n", 0, idx) + 1
+    end = _WELL_KNOWN_JOINED.find("\n", idx)
+    return _WELL_KNOWN_JOINED[start:end if end >= 0 else None]
+
 
 def validate_source(product: dict) -> tuple[bool, str]:
     """验证产品来源是否可信"""
@@ -1480,17 +1898,15 @@ def validate_source(product: dict) -> tuple[bool, str]:
     if not source:
         source = ""
 
-    for untrusted in UNTRUSTED_SOURCES:
-        if source and untrusted.lower() in source:
-            return False, f"untrusted source: {source}"
+    if source and _UNTRUSTED_SOURCE_RE.search(source):
+        return False, f"untrusted source: {source}"
 
     if source_url:
         domain = normalize_url(source_url)
         if domain in PLACEHOLDER_SOURCE_DOMAINS:
             return False, f"placeholder source_url domain: {domain}"
-        for blocked in UNTRUSTED_SOURCE_DOMAINS:
-            if blocked in domain:
-                return False, f"untrusted source_url domain: {domain}"
+        if _UNTRUSTED_SOURCE_DOMAIN_RE.search(domain):
+            return False, f"untrusted source_url domain: {domain}"
 
     return True, "source ok"
 
@@ -1501,16 +1917,16 @@ def validate_product_name(name: str) -> tuple[bool, str]:
         return False, "empty name"
 
     # 检查博客标题特征
-    if len(name) > 10:
+    if len(name) > 10 and _BLOG_TITLE_MARKER_RE.search(name):
         matching_markers = [m for m in BLOG_TITLE_MARKERS if m in name]
         if len(matching_markers) >= 1:
             return False, f"name looks like blog title (markers: {matching_markers})"
 
     # 检查通用概念名
     name_lower = name.lower().strip()
-    for concept in GENERIC_CONCEPT_NAMES:
-        if name_lower == concept.lower() or name_lower.startswith(concept.lower()):
-            return False, f"name is generic concept: {concept}"
+    if name_lower.startswith(_GENERIC_CONCEPT_PREFIXES):
+        concept = next(c for c, p in _GENERIC_CONCEPTS_LOWER if name_lower.startswith(p))
+        return False, f"name is generic concept: {concept}"
 
     return True, "name ok"
 
@@ -1580,6 +1996,9 @@ def validate_against_search_results(
     return False, f"product '{name}' not found in search results (possible hallucination)"
 
 
+_WHY_MATTERS_NUMBER_RE = re.compile(r'[\$¥€]\d+|ARR|\d+[MBK万亿]|\d+%')
+
+
 def validate_product(product: dict) -> tuple[bool, str]:
     """
     验证产品质量，返回 (是否通过, 原因)
@@ -1639,27 +2058,22 @@ def validate_product(product: dict) -> tuple[bool, str]:
     # 4. 检查 why_matters 是否太泛化
     #    Fix: use OR — reject if contains generic phrase OR is too short.
     #    Previous AND logic allowed very short generic texts through.
-    why_lower = why_matters.lower()
-    for generic in GENERIC_WHY_MATTERS:
-        if generic in why_lower or len(why_matters) < 30:
-            return False, f"generic why_matters: contains '{generic}' or too short ({len(why_matters)} chars)"
+    if len(why_matters) < 30:
+        generic = GENERIC_WHY_MATTERS[0]
+        return False, f"generic why_matters: contains '{generic}' or too short ({len(why_matters)} chars)"
+    generic_match = _GENERIC_WHY_MATTERS_RE.search(why_matters.lower())
+    if generic_match:
+        generic = generic_match.group(0)
+        return False, f"generic why_matters: contains '{generic}' or too short ({len(why_matters)} chars)"
 
     # 5. 检查 why_matters 是否包含具体数字（融资/ARR/用户数）
-    has_number = bool(re.search(r'[\$¥€]\d+|ARR|\d+[MBK万亿]|\d+%', why_matters))
-    has_specific = any(kw in why_matters for kw in [
-        '领投', '融资', '估值', '用户', '增长', 'ARR', '首创', '首个',
-        '前OpenAI', '前Google', '前Meta', 'YC', 'a16z', 'Sequoia',
-    ])
+    has_number = bool(_WHY_MATTERS_NUMBER_RE.search(why_matters))
+    has_specific = bool(_WHY_MATTERS_SPECIFIC_RE.search(why_matters))
     if not has_number and not has_specific:
         return False, "why_matters lacks specific details"
 
     # 6. 检查 name 是否像新闻标题（中文区更容易把标题当产品名）
-    news_patterns = [
-        '融资', '宣布', '发布', '获得', '完成', '推出', '上线',
-        '投资', '领投', '参投', '被投', '收购', '估值',
-        '独家', '爆料', '报道', '曝光', '传出', '消息', '传闻',
-    ]
-    if any(p in name for p in news_patterns) and len(name) >= 8:
+    if len(name) >= 8 and _NEWS_HEADLINE_RE.search(name):
         return False, "name looks like news headline"
 
     # 7. 检查是否是知名产品
@@ -1667,9 +2081,9 @@ def validate_product(product: dict) -> tuple[bool, str]:
     if name_lower in WELL_KNOWN_PRODUCTS:
         return False, f"well-known product: {name}"
     # 检查部分匹配（例如 "ChatGPT Plus" 包含 "chatgpt"）
-    for known in WELL_KNOWN_PRODUCTS:
-        if known in name_lower or name_lower in known:
-            return False, f"well-known product match: {known}"
+    known = _match_well_known_product(name_lower)
+    if known:
+        return False, f"well-known product match: {known}"
 
     # 8. 检查黑马(4-5分)是否满足至少1条标准（放宽要求）
     # 注：原来要求 ≥2 条标准太严格，导致产出太少
@@ -1711,26 +2125,19 @@ def load_existing_domains() -> set:
     """加载所有已存在的产品域名"""
     domains = set()
 
-    for dir_path in [DARK_HORSES_DIR, RISING_STARS_DIR]:
-        if os.path.exists(dir_path):
-            for f in os.listdir(dir_path):
-                if f.endswith('.json'):
-                    try:
-                        with open(os.path.join(dir_path, f), 'r') as file:
-                            products = json.load(file)
-                            for p in products:
-                                domain = normalize_url(p.get('website', ''))
-                                if domain:
-                                    domains.add(domain)
-                    except:
-                        pass
+    for path, mtime_ns in _existing_product_files():
+        try:
+            domains.update(_product_file_index(path, mtime_ns)[1])
+        except (OSError, ValueError):
+            continue
 
     return domains
 
 
+@functools.lru_cache(maxsize=1)
 def get_perplexity_client():
     """
-    获取 Perplexity 客户端
+    获取 Perplexity 客户端（进程内复用同一实例，共享连接池）
 
     Returns:
         PerplexityClient 实例或 None
@@ -1750,9 +2157,10 @@ def get_perplexity_client():
         return None
 
 
+@functools.lru_cache(maxsize=1)
 def get_glm_client():
     """
-    获取 GLM (智谱) 客户端
+    获取 GLM (智谱) 客户端（进程内复用同一实例，共享连接池）
 
     Returns:
         GLMClient 实例或 None
@@ -1772,6 +2180,7 @@ def get_glm_client():
         return None
 
 
+@functools.lru_cache(maxsize=16)
 def get_provider_for_region(region_key: str) -> str:
     """
     根据地区返回搜索 provider
@@ -1780,6 +2189,9 @@ def get_provider_for_region(region_key: str) -> str:
     - cn (中国) → GLM (如果可用且启用)
     - 其他地区 → Perplexity
 
+    ZHIPU_API_KEY / USE_GLM_FOR_CN 在导入时确定，结果按地区缓存；
+    运行中修改这两个值后需调用 get_provider_for_region.cache_clear()。
+
     Args:
         region_key: 地区代码 (us/cn/eu/jp/kr/sea)
 
@@ -1791,6 +2203,35 @@ def get_provider_for_region(region_key: str) -> str:
     return "perplexity"
 
 
+_glm_cooldown_lock = threading.Lock()
+_last_glm_keyword_at = 0.0
+
+
+def wait_for_glm_cooldown() -> float:
+    """
+    GLM 关键词间冷却：只补足距上一个 GLM 关键词结束不足 GLM_KEYWORD_DELAY 的部分
+
+    去重/评分/其他地区的工作已经消耗掉的时间不再重复等待。返回实际等待秒数。
+    """
+    if GLM_KEYWORD_DELAY <= 0:
+        return 0.0
+    with _glm_cooldown_lock:
+        if not _last_glm_keyword_at:
+            return 0.0
+        remaining = GLM_KEYWORD_DELAY - (time.monotonic() - _last_glm_keyword_at)
+        if remaining <= 0:
+            return 0.0
+        print(f"    ⏳ GLM cooldown: sleeping {remaining:.1f}s")
+        time.sleep(remaining)
+        return remaining
+
+
+def mark_glm_keyword_done() -> None:
+    global _last_glm_keyword_at
+    with _glm_cooldown_lock:
+        _last_glm_keyword_at = time.monotonic()
+
+
 def perplexity_search(
     query: str,
     count: int = 10,
@@ -1833,9 +2274,163 @@ def perplexity_search(
         return []
 
 
+def perplexity_search_batch(
+    queries: List[str],
+    count: int = 10,
+    region: Optional[str] = None,
+) -> Dict[str, list]:
+    """
+    多查询搜索：每 AUTO_DISCOVER_SEARCH_BATCH_SIZE 个关键词合并为一次 Search API 请求
+
+    批量响应无法按 query 对齐时，该批回退为逐条搜索。
+
+    Returns:
+        {query: [{"title": "", "url": "", "content": ""}, ...]}
+    """
+    results_by_query: Dict[str, list] = {}
+    queries = [q for q in dict.fromkeys(queries) if q]
+    if not queries:
+        return results_by_query
+
+    client = get_perplexity_client()
+    if not client:
+        return results_by_query
+
+    batch_size = max(1, AUTO_DISCOVER_SEARCH_BATCH_SIZE)
+    for start in range(0, len(queries), batch_size):
+        chunk = queries[start:start + batch_size]
+        grouped = None
+        try:
+            grouped = client.search_many_by_region(chunk, region=region or "us", max_results=count)
+        except Exception as e:
+            print(f"  ❌ Perplexity Batch Search Error: {e}")
+        if grouped is None:
+            for query in chunk:
+                results_by_query[query] = perplexity_search(query, count=count, region=region)
+            continue
+        for query, results in zip(chunk, grouped):
+            results_by_query[query] = [r.to_dict() for r in results]
+    return results_by_query
+
+
+# 单次运行内的搜索结果记忆（main() 开始时清空）：重复/等价 query 不再发请求
+_search_memo: Dict[Tuple[str, str, str], list] = {}
+_search_memo_lock = threading.Lock()
+
+
+def _search_memo_key(provider: str, query: str, region_key: str) -> Tuple[str, str, str]:
+    """词序/重复词不同的同一查询（"AI startup funding" / "funding AI startup"）共用一个 key"""
+    tokens = sorted(set(str(query or "").lower().split()))
+    return provider, " ".join(tokens), region_key
+
+
+def get_memoized_search(provider: str, query: str, region_key: str) -> Optional[list]:
+    with _search_memo_lock:
+        results = _search_memo.get(_search_memo_key(provider, query, region_key))
+    return list(results) if results is not None else None
+
+
+def memoize_search(provider: str, query: str, region_key: str, results: list) -> None:
+    """只记住非空结果，失败/空结果允许重试"""
+    if not results:
+        return
+    with _search_memo_lock:
+        _search_memo[_search_memo_key(provider, query, region_key)] = list(results)
+
+
+def clear_search_memo() -> None:
+    with _search_memo_lock:
+        _search_memo.clear()
+
+
+def prefetch_search_results(keywords: List[str], region_key: str) -> Dict[str, list]:
+    """Perplexity 地区预先批量搜索本轮关键词；GLM 或未开启批量时返回空 dict（逐条搜索）"""
+    if AUTO_DISCOVER_SEARCH_BATCH_SIZE <= 1 or len(keywords) <= 1:
+        return {}
+    if get_provider_for_region(region_key) != "perplexity":
+        return {}
+    prefetched: Dict[str, list] = {}
+    misses = []
+    for keyword in keywords:
+        cached = get_memoized_search("perplexity", keyword, region_key)
+        if cached is None:
+            misses.append(keyword)
+        else:
+            prefetched[keyword] = cached
+    if len(misses) <= 1:
+        return prefetched
+    print(f"    🔍 Using Perplexity batch search for {region_key} ({len(misses)} queries)")
+    for keyword, results in perplexity_search_batch(misses, region=region_key).items():
+        memoize_search("perplexity", keyword, region_key, results)
+        prefetched[keyword] = results
+    return prefetched
+
+
+_llm_response_cache = None
+_llm_response_cache_opened = False
+_llm_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache():
+    """LLM 响应缓存（进程内单例；关闭 / 模块缺失 / 打开失败时返回 None）"""
+    global _llm_response_cache, _llm_response_cache_opened
+    if not AUTO_DISCOVER_LLM_CACHE or not HAS_LLM_RESPONSE_CACHE:
+        return None
+    if not _llm_response_cache_opened:
+        with _llm_response_cache_lock:
+            if not _llm_response_cache_opened:
+                _llm_response_cache = open_llm_response_cache(
+                    AUTO_DISCOVER_LLM_CACHE_DB, ttl_days=AUTO_DISCOVER_LLM_CACHE_TTL_DAYS
+                )
+                _llm_response_cache_opened = True
+    return _llm_response_cache
+
+
+def cached_llm_analyze(provider: str, client, prompt: str,
+                       temperature: float = 0.3, max_tokens: int = 4096,
+                       system_prompt: Optional[str] = None):
+    """client.analyze 外包一层磁盘缓存：命中直接返回，跳过网络请求和限流等待"""
+    cache = get_llm_response_cache()
+    key = None
+    if cache is not None:
+        model = str(getattr(client, "model", "") or "")
+        cache_prompt = f"{system_prompt}\0{prompt}" if system_prompt else prompt
+        key = LlmResponseCache.cache_key(provider, model, cache_prompt, temperature)
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"    ♻️ LLM cache hit ({provider})")
+            return cached
+
+    kwargs = {"system_prompt": system_prompt} if system_prompt else {}
+    result = client.analyze(prompt=prompt, temperature=temperature, max_tokens=max_tokens, **kwargs)
+    if cache is not None and isinstance(result, (dict, list)):
+        cache.put(key, result)
+    return result
+
+
+def max_tokens_for_task(task: str, content=None) -> int:
+    """按任务设置输出上限：评分只返回一小段 JSON，不需要抽取那样的 4096"""
+    if task == "score":
+        return AUTO_DISCOVER_SCORE_MAX_TOKENS
+    if task == "score_batch":
+        count = len(content) if isinstance(content, list) else 1
+        return min(AUTO_DISCOVER_EXTRACT_MAX_TOKENS, AUTO_DISCOVER_SCORE_MAX_TOKENS * max(1, count))
+    return AUTO_DISCOVER_EXTRACT_MAX_TOKENS
+
+
+def _build_score_batch_prompt(products: list) -> str:
+    if USE_MODULAR_PROMPTS:
+        return get_scoring_batch_prompt(products)
+    return (
+        "逐个评估以下产品的黑马指数(1-5分)，返回与输入一一对应的 JSON 数组 "
+        '[{"name": "", "dark_horse_index": 4, "criteria_met": [], "reason": ""}]:\n'
+        + dumps_json_text(products)
+    )
+
+
 def analyze_with_perplexity(content: str, task: str = "extract", region: str = "🇺🇸",
                             quota_remaining: dict = None, region_key: str = "us",
-                            product_type: str = "mixed") -> dict:
+                            product_type: str = "mixed", prompt_max_chars: Optional[int] = None) -> dict:
     """
     使用 Perplexity Sonar 模型分析内容
 
@@ -1847,6 +2442,7 @@ def analyze_with_perplexity(content: str, task: str = "extract", region: str = "
         region: 地区标识 (emoji flag)
         quota_remaining: 剩余配额 {"dark_horses": n, "rising_stars": m}
         region_key: 地区代码 (cn/us/eu/jp/kr/sea) 用于选择 prompt 语言
+        prompt_max_chars: 搜索结果截断长度（批量抽取时放宽）
 
     Returns:
         解析后的 JSON（产品列表或评分结果）
@@ -1857,20 +2453,22 @@ def analyze_with_perplexity(content: str, task: str = "extract", region: str = "
 
     if quota_remaining is None:
         quota_remaining = DAILY_QUOTA.copy()
+    max_chars = prompt_max_chars or AUTO_DISCOVER_PROMPT_MAX_CHARS
+    system_prompt = None  # 静态规则单独作为 system 消息（前缀缓存）
 
     # 构建 prompt
     if task == "extract":
         if USE_MODULAR_PROMPTS and product_type == "hardware":
-            prompt = get_hardware_analysis_prompt(
-                search_results=content[:AUTO_DISCOVER_PROMPT_MAX_CHARS],
+            system_prompt, prompt = get_hardware_analysis_messages(
+                search_results=content[:max_chars],
                 region=region,
                 quota_dark_horses=quota_remaining.get("dark_horses", 5),
                 quota_rising_stars=quota_remaining.get("rising_stars", 10)
             )
         elif USE_MODULAR_PROMPTS:
-            prompt = get_analysis_prompt(
+            system_prompt, prompt = get_analysis_messages(
                 region_key=region_key,
-                search_results=content[:AUTO_DISCOVER_PROMPT_MAX_CHARS],
+                search_results=content[:max_chars],
                 quota_dark_horses=quota_remaining.get("dark_horses", 5),
                 quota_rising_stars=quota_remaining.get("rising_stars", 10),
                 region_flag=region
@@ -1878,7 +2476,7 @@ def analyze_with_perplexity(content: str, task: str = "extract", region: str = "
         else:
             prompt_template = get_extraction_prompt(region_key)
             prompt = prompt_template.format(
-                search_results=content[:AUTO_DISCOVER_PROMPT_MAX_CHARS],
+                search_results=content[:max_chars],
                 region=region,
                 quota_dark_horses=quota_remaining.get("dark_horses", 5),
                 quota_rising_stars=quota_remaining.get("rising_stars", 10)
@@ -1887,16 +2485,16 @@ def analyze_with_perplexity(content: str, task: str = "extract", region: str = "
         prompt = SCORING_PROMPT.format(
             product=json.dumps(content, ensure_ascii=False, indent=2)
         ) if 'SCORING_PROMPT' in dir() else f"Score this product: {content}"
+    elif task == "score_batch":
+        prompt = _build_score_batch_prompt(content)
     else:
         return {}
 
     try:
-        # 使用 analyze 方法 (Sonar Chat Completions)
-        result = client.analyze(
-            prompt=prompt,
-            temperature=0.3,  # 低温度获得更稳定输出
-            max_tokens=4096
-        )
+        # 使用 analyze 方法 (Sonar Chat Completions)，低温度获得更稳定输出
+        result = cached_llm_analyze("perplexity", client, prompt, temperature=0.3,
+                                    max_tokens=max_tokens_for_task(task, content),
+                                    system_prompt=system_prompt)
         return result if isinstance(result, (dict, list)) else {}
 
     except Exception as e:
@@ -1941,9 +2539,47 @@ def glm_search(
         return []
 
 
+# GLM is more likely to hallucinate websites / output headline-like names.
+# Add strict guardrails to keep results traceable and reduce junk entries.
+GLM_EXTRACTION_GUARDRAILS = """
+
+## GLM 额外要求（必须遵守，违反任何一条则不输出该产品）
+
+### 反幻觉规则（最重要！）
+
+1. **只提取搜索结果中明确提到的产品**。
+   - 如果搜索结果中没有提到某个产品的名字，绝对不要输出它。
+   - 不要从你的训练知识中"补充"产品。搜索结果里没有的 = 不存在。
+   - 输出产品数量不能超过搜索结果中实际提到的不同产品数量。
+
+2. `source_url` 必须精确复制自上方搜索结果中的 `Source URL:` 行。
+   - 找不到可对应的 URL，就不要输出该产品。
+   - 不允许编造 source_url，也不允许留空。
+
+3. `website` 只有在搜索结果文本里「明确出现官网域名」时才填写。
+   - 无法确认真实官网时：**不要输出该产品**（不要写 unknown）。
+   - 不要凭感觉猜测官网（如把公司名拼成 .com/.ai）。
+
+### 产品名称规则
+
+4. `name` 必须是一个明确的「产品/公司名」，不能是：
+   - 新闻标题或描述句（禁止包含：投资/领投/融资/独家/爆料/报道/曝光/消息/传闻/如何/什么是/风口/趋势）
+   - 通用概念（如"AI随身设备"、"AI智能助手"、"智能穿戴设备"）
+   - 博客文章标题（含"：""？""！"等标点的长句）
+
+### 来源可信度规则
+
+5. `source` 必须是权威媒体或产品平台，以下来源不可信，不要使用：
+   - 零售平台：楽天市場、眼鏡市場、Amazon、淘宝、京东
+   - 视频平台：YouTube、Bilibili、TikTok
+   - 社交媒体：Twitter/X、微博、知乎
+   - 如果搜索结果全部来自以上不可信来源，返回空数组 `[]`
+"""
+
+
 def analyze_with_glm(content: str, task: str = "extract", region: str = "🇨🇳",
                      quota_remaining: dict = None, region_key: str = "cn",
-                     product_type: str = "mixed") -> dict:
+                     product_type: str = "mixed", prompt_max_chars: Optional[int] = None) -> dict:
     """
     使用 GLM 模型分析内容 (中国区)
 
@@ -1953,6 +2589,7 @@ def analyze_with_glm(content: str, task: str = "extract", region: str = "🇨
         region: 地区标识 (emoji flag)
         quota_remaining: 剩余配额 {"dark_horses": n, "rising_stars": m}
         region_key: 地区代码
+        prompt_max_chars: 搜索结果截断长度（批量抽取时放宽）
 
     Returns:
         解析后的 JSON（产品列表或评分结果）
@@ -1963,20 +2600,22 @@ def analyze_with_glm(content: str, task: str = "extract", region: str = "🇨
 
     if quota_remaining is None:
         quota_remaining = DAILY_QUOTA.copy()
+    max_chars = prompt_max_chars or AUTO_DISCOVER_PROMPT_MAX_CHARS
+    system_prompt = None  # 静态规则单独作为 system 消息（前缀缓存）
 
     # 构建 prompt (中国区使用中文 prompt)
     if task == "extract":
         if USE_MODULAR_PROMPTS and product_type == "hardware":
-            prompt = get_hardware_analysis_prompt(
-                search_results=content[:AUTO_DISCOVER_PROMPT_MAX_CHARS],
+            system_prompt, prompt = get_hardware_analysis_messages(
+                search_results=content[:max_chars],
                 region=region,
                 quota_dark_horses=quota_remaining.get("dark_horses", 5),
                 quota_rising_stars=quota_remaining.get("rising_stars", 10)
             )
         elif USE_MODULAR_PROMPTS:
-            prompt = get_analysis_prompt(
+            system_prompt, prompt = get_analysis_messages(
                 region_key=region_key,
-                search_results=content[:AUTO_DISCOVER_PROMPT_MAX_CHARS],
+                search_results=content[:max_chars],
                 quota_dark_horses=quota_remaining.get("dark_horses", 5),
                 quota_rising_stars=quota_remaining.get("rising_stars", 10),
                 region_flag=region
@@ -1984,62 +2623,30 @@ def analyze_with_glm(content: str, task: str = "extract", region: str = "🇨
         else:
             prompt_template = get_extraction_prompt("cn")
             prompt = prompt_template.format(
-                search_results=content[:AUTO_DISCOVER_PROMPT_MAX_CHARS],
+                search_results=content[:max_chars],
                 region=region,
                 quota_dark_horses=quota_remaining.get("dark_horses", 5),
                 quota_rising_stars=quota_remaining.get("rising_stars", 10)
             )
 
-        # GLM is more likely to hallucinate websites / output headline-like names.
-        # Add strict guardrails to keep results traceable and reduce junk entries.
-        prompt += """
+        if system_prompt:
+            system_prompt += GLM_EXTRACTION_GUARDRAILS
+        else:
+            prompt += GLM_EXTRACTION_GUARDRAILS
+    elif task == "score":
+        prompt = SCORING_PROMPT.format(
+            product=json.dumps(content, ensure_ascii=False, indent=2)
+        ) if 'SCORING_PROMPT' in dir() else f"评分产品: {content}"
+    elif task == "score_batch":
+        prompt = _build_score_batch_prompt(content)
+    else:
+        return {}
 
-## GLM 额外要求（必须遵守，违反任何一条则不输出该产品）
-
-### 反幻觉规则（最重要！）
-
-1. **只提取搜索结果中明确提到的产品**。
-   - 如果搜索结果中没有提到某个产品的名字，绝对不要输出它。
-   - 不要从你的训练知识中"补充"产品。搜索结果里没有的 = 不存在。
-   - 输出产品数量不能超过搜索结果中实际提到的不同产品数量。
-
-2. `source_url` 必须精确复制自上方搜索结果中的 `Source URL:` 行。
-   - 找不到可对应的 URL，就不要输出该产品。
-   - 不允许编造 source_url，也不允许留空。
-
-3. `website` 只有在搜索结果文本里「明确出现官网域名」时才填写。
-   - 无法确认真实官网时：**不要输出该产品**（不要写 unknown）。
-   - 不要凭感觉猜测官网（如把公司名拼成 .com/.ai）。
-
-### 产品名称规则
-
-4. `name` 必须是一个明确的「产品/公司名」，不能是：
-   - 新闻标题或描述句（禁止包含：投资/领投/融资/独家/爆料/报道/曝光/消息/传闻/如何/什么是/风口/趋势）
-   - 通用概念（如"AI随身设备"、"AI智能助手"、"智能穿戴设备"）
-   - 博客文章标题（含"：""？""！"等标点的长句）
-
-### 来源可信度规则
-
-5. `source` 必须是权威媒体或产品平台，以下来源不可信，不要使用：
-   - 零售平台：楽天市場、眼鏡市場、Amazon、淘宝、京东
-   - 视频平台：YouTube、Bilibili、TikTok
-   - 社交媒体：Twitter/X、微博、知乎
-   - 如果搜索结果全部来自以上不可信来源，返回空数组 `[]`
-"""
-    elif task == "score":
-        prompt = SCORING_PROMPT.format(
-            product=json.dumps(content, ensure_ascii=False, indent=2)
-        ) if 'SCORING_PROMPT' in dir() else f"评分产品: {content}"
-    else:
-        return {}
-
-    try:
-        result = client.analyze(
-            prompt=prompt,
-            temperature=0.3,
-            max_tokens=4096
-        )
-        return result if isinstance(result, (dict, list)) else {}
+    try:
+        result = cached_llm_analyze("glm", client, prompt, temperature=0.3,
+                                    max_tokens=max_tokens_for_task(task, content),
+                                    system_prompt=system_prompt)
+        return result if isinstance(result, (dict, list)) else {}
 
     except Exception as e:
         print(f"  ❌ GLM Analysis Error: {e}")
@@ -2067,17 +2674,24 @@ def search_with_provider(query: str, region_key: str, search_engine: str = "bing
         搜索结果列表
     """
     provider = get_provider_for_region(region_key)
+    cached = get_memoized_search(provider, query, region_key)
+    if cached is not None:
+        print(f"    ♻️ Reusing {provider} results from this run for {region_key}")
+        return cached
 
     if provider == "glm":
         print(f"    🔍 Using GLM for {region_key}")
-        return glm_search(query, region=region_key)
+        results = glm_search(query, region=region_key)
     else:
         print(f"    🔍 Using Perplexity for {region_key}")
-        return perplexity_search(query, region=region_key)
+        results = perplexity_search(query, region=region_key)
+    memoize_search(provider, query, region_key, results)
+    return results
 
 
 def analyze_with_provider(content, task: str, region_key: str, region_flag: str = "🇺🇸",
-                          quota_remaining: dict = None, product_type: str = "mixed"):
+                          quota_remaining: dict = None, product_type: str = "mixed",
+                          prompt_max_chars: Optional[int] = None):
     """
     根据地区路由分析请求
 
@@ -2091,6 +2705,7 @@ def analyze_with_provider(content, task: str, region_key: str, region_flag: str
         region_key: 地区代码 (us/cn/eu/jp/kr/sea)
         region_flag: 地区标识 (emoji)
         quota_remaining: 剩余配额
+        prompt_max_chars: 搜索结果截断长度（默认 AUTO_DISCOVER_PROMPT_MAX_CHARS）
 
     Returns:
         分析结果
@@ -2098,28 +2713,77 @@ def analyze_with_provider(content, task: str, region_key: str, region_flag: str
     provider = get_provider_for_region(region_key)
 
     if provider == "glm":
-        return analyze_with_glm(content, task, region_flag, quota_remaining, region_key, product_type)
+        return analyze_with_glm(content, task, region_flag, quota_remaining, region_key, product_type,
+                                prompt_max_chars=prompt_max_chars)
     else:
-        return analyze_with_perplexity(content, task, region_flag, quota_remaining, region_key, product_type)
+        return analyze_with_perplexity(content, task, region_flag, quota_remaining, region_key, product_type,
+                                       prompt_max_chars=prompt_max_chars)
+
+
+_HTML_SCRIPT_RE = re.compile(r'<script[^>]*>[\s\S]*?</script>')
+_HTML_STYLE_RE = re.compile(r'<style[^>]*>[\s\S]*?</style>')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_NAME_TOKEN_RE = re.compile(r'[a-z0-9]{3,}')
+
+
+# 页面正文截断到 FETCH_MAX_CHARS 字符，去掉标签/脚本后 256KB HTML 基本够用，读满即断开下载
+FETCH_MAX_CHARS = 15000
+FETCH_MAX_BYTES = int(os.environ.get('AUTO_DISCOVER_FETCH_MAX_BYTES', str(256 * 1024)))
+FETCH_CHUNK_SIZE = 16384
+
+
+def html_to_text(raw: bytes) -> str:
+    """去掉 script/style 和标签，返回压缩空白后的正文（lxml 可用时走 C 解析器，否则回退正则）"""
+    # 无 meta charset 时 libxml2 默认按 latin-1 解码 bytes，中文页会乱码，所以先统一按 utf-8 解码
+    content = raw.decode('utf-8', errors='ignore')
+    if HAS_LXML:
+        try:
+            doc = lxml.html.fromstring(content)
+            for element in doc.xpath('//script|//style'):
+                element.drop_tree()
+            # text_content() 直接拼接相邻文本节点（<li>Foo</li><li>Bar</li> → "FooBar"），按节点用空格分隔
+            return _WHITESPACE_RE.sub(' ', ' '.join(doc.itertext()))
+        except Exception:
+            pass
+
+    content = _HTML_SCRIPT_RE.sub('', content)
+    content = _HTML_STYLE_RE.sub('', content)
+    content = _HTML_TAG_RE.sub(' ', content)
+    return _WHITESPACE_RE.sub(' ', content)
+
+
+_page_fetch_session = None
+_page_fetch_session_lock = threading.Lock()
+
+
+def get_page_fetch_session() -> requests.Session:
+    """抓取渠道页面共用的连接池 Session（keep-alive 复用连接，连接错误/5xx 自动重试 2 次）"""
+    global _page_fetch_session
+    if _page_fetch_session is None:
+        with _page_fetch_session_lock:
+            if _page_fetch_session is None:
+                session = build_pooled_session(max_retries=2) if HAS_HTTP_SESSION else requests.Session()
+                session.headers['User-Agent'] = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'
+                _page_fetch_session = session
+    return _page_fetch_session
 
 
 def fetch_url_content(url: str) -> str:
     """抓取 URL 内容"""
     try:
-        import urllib.request
-        req = urllib.request.Request(
-            url,
-            headers={'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'}
-        )
-        with urllib.request.urlopen(req, timeout=15) as response:
-            content = response.read().decode('utf-8', errors='ignore')
-
-            # 简单提取正文（去除 HTML 标签）
-            content = re.sub(r'<script[^>]*>[\s\S]*?</script>', '', content)
-            content = re.sub(r'<style[^>]*>[\s\S]*?</style>', '', content)
-            content = re.sub(r'<[^>]+>', ' ', content)
-            content = re.sub(r'\s+', ' ', content)
-            return content[:15000]  # 限制长度
+        with get_page_fetch_session().get(url, timeout=15, stream=True) as response:
+            response.raise_for_status()
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= FETCH_MAX_BYTES:
+                    break
+            raw = b''.join(chunks)[:FETCH_MAX_BYTES]
+
+        # 简单提取正文（去除 HTML 标签）
+        return html_to_text(raw)[:FETCH_MAX_CHARS]  # 限制长度
     except Exception as e:
         print(f"  Fetch error: {e}")
         return ""
@@ -2128,7 +2792,7 @@ def fetch_url_content(url: str) -> str:
 def _normalize_match_text(text: str) -> str:
     if not text:
         return ""
-    return re.sub(r'\s+', '', text.lower())
+    return _WHITESPACE_RE.sub('', text.lower())
 
 
 def _score_search_result_for_name(name: str, result: dict) -> int:
@@ -2148,7 +2812,7 @@ def _score_search_result_for_name(name: str, result: dict) -> int:
     if name_norm in url:
         score += 2
 
-    tokens = re.findall(r'[a-z0-9]{3,}', name.lower())
+    tokens = _NAME_TOKEN_RE.findall(name.lower())
     for token in tokens:
         if token in title:
             score += 2
@@ -2186,6 +2850,113 @@ def attach_source_url(product: dict, search_results: list, min_score: int = 4) -
             product['source_title'] = title
 
 
+def assign_products_to_batch(products: list, result_groups: List[List[dict]]) -> List[List[dict]]:
+    """
+    把批量抽取的产品分回各自的关键词
+
+    优先按 source_url 精确匹配，否则按名称与搜索结果的匹配分；都匹配不上归入第一个 Block。
+    """
+    assigned: List[List[dict]] = [[] for _ in result_groups]
+    if not result_groups:
+        return assigned
+
+    for product in products:
+        if not isinstance(product, dict):
+            continue
+        name = product.get('name', '')
+        source_url = str(product.get('source_url') or '').strip()
+        best_idx, best_score = 0, 0
+        for idx, results in enumerate(result_groups):
+            for result in results:
+                if source_url and source_url == str(result.get('url') or '').strip():
+                    score = 100
+                else:
+                    score = _score_search_result_for_name(name, result)
+                if score > best_score:
+                    best_idx, best_score = idx, score
+        assigned[best_idx].append(product)
+    return assigned
+
+
+def open_discovery_seen_cache(dry_run: bool):
+    """打开跨运行的已见 URL 缓存（dry-run / 关闭 / 模块缺失时返回 None）"""
+    if dry_run or not AUTO_DISCOVER_SEEN_URL_CACHE or not HAS_SEEN_URL_CACHE:
+        return None
+    return open_seen_url_cache(AUTO_DISCOVER_SEEN_URL_DB, ttl_days=AUTO_DISCOVER_SEEN_URL_TTL_DAYS)
+
+
+def filter_seen_search_results(seen_cache, search_results: List[dict]) -> List[dict]:
+    """去掉以前运行中已经抽取过的搜索结果，全部见过时返回空列表（跳过 LLM 抽取）"""
+    if seen_cache is None or not search_results:
+        return search_results
+    fresh = [
+        result for result in search_results
+        if not seen_cache.contains(normalize_result_url(str(result.get('url') or '')))
+    ]
+    skipped = len(search_results) - len(fresh)
+    if skipped:
+        print(f"    ⏭️ Seen-URL cache: skipped {skipped}/{len(search_results)} results")
+    return fresh
+
+
+SEARCH_PAGE_SIZE = 10  # perplexity_search / glm_search 默认 count
+PROVIDER_MAX_SEARCH_RESULTS = {"perplexity": 20, "glm": 50}  # 单次请求上限
+
+
+def search_provider_with_count(query: str, region_key: str, count: int) -> list:
+    provider = get_provider_for_region(region_key)
+    if provider == "glm":
+        return glm_search(query, count=count, region=region_key)
+    return perplexity_search(query, count=count, region=region_key)
+
+
+def fresh_search_results(seen_cache, keyword: str, region_key: str, search_results: List[dict]) -> List[dict]:
+    """
+    过滤已见结果；新结果太少时按更大的 count 重搜（两个搜索 API 都没有翻页游标）
+
+    只在上一次是满页（可能还有更多结果）时加深，最多 AUTO_DISCOVER_SEARCH_MAX_PAGES 次请求，
+    用同一关键词的更深结果代替换关键词重搜 + 重新抽取。
+    """
+    fresh = filter_seen_search_results(seen_cache, search_results)
+    if seen_cache is None or AUTO_DISCOVER_SEARCH_MAX_PAGES <= 1:
+        return fresh
+
+    provider_max = PROVIDER_MAX_SEARCH_RESULTS.get(get_provider_for_region(region_key), SEARCH_PAGE_SIZE)
+    known = {normalize_result_url(str(r.get('url') or '')) for r in search_results}
+    page_count = len(search_results)
+    pages = 1
+    while (
+        len(fresh) < AUTO_DISCOVER_MIN_FRESH_RESULTS
+        and pages < AUTO_DISCOVER_SEARCH_MAX_PAGES
+        and page_count >= SEARCH_PAGE_SIZE * pages
+        and page_count < provider_max
+    ):
+        pages += 1
+        count = min(provider_max, SEARCH_PAGE_SIZE * pages)
+        print(f"    📄 Only {len(fresh)} fresh results, searching deeper (count={count})")
+        deeper = search_provider_with_count(keyword, region_key, count)
+        page_count = len(deeper)
+        extra = []
+        for result in deeper:
+            key = normalize_result_url(str(result.get('url') or ''))
+            if key in known:
+                continue
+            known.add(key)
+            extra.append(result)
+        fresh.extend(filter_seen_search_results(seen_cache, extra))
+    return fresh
+
+
+def mark_search_results_seen(seen_cache, search_results: List[dict], reason: str) -> None:
+    """记录已经过 LLM 抽取的搜索结果（saved / rejected）"""
+    if seen_cache is None or not search_results:
+        return
+    seen_cache.add_many(
+        (normalize_result_url(str(result.get('url') or '')) for result in search_results),
+        reason=reason,
+    )
+
+
 def try_recover_unknown_website(product: dict, *, aggressive: bool = False) -> bool:
     """Try to recover official website from source article when website is unknown."""
     if not AUTO_DISCOVER_WEBSITE_RECOVERY or not HAS_WEBSITE_RESOLVER:
@@ -2255,36 +3026,82 @@ def fetch_with_provider(source_config: dict, limit: int = 10) -> list:
             products = []
 
     print(f"  Found {len(products)} potential products")
+    products = products[:limit]
 
-    # 补充信息并评分
+    # 补充信息
     result = []
-    for p in products[:limit]:
+    discovered_at = datetime.utcnow().strftime('%Y-%m-%d')
+    for p in products:
         # 添加来源信息
         p['source'] = source_name
         p['source_region'] = region_flag
-        p['discovered_at'] = datetime.utcnow().strftime('%Y-%m-%d')
+        p['discovered_at'] = discovered_at
         if url and not p.get('source_url'):
             p['source_url'] = url
         apply_country_fields(p, fallback_region_flag=region_flag)
+        result.append(p)
 
-        score_result = analyze_with_provider(p, task="score", region_key=region_key, region_flag=region_flag)
-        if isinstance(score_result, dict) and score_result:
-            p['dark_horse_index'] = score_result.get('score', p.get('dark_horse_index', 2))
-            if 'reason' in score_result:
-                p['score_reason'] = score_result['reason']
-
+    # 抽取 prompt 已经给出 dark_horse_index 的不再评分；其余每 AUTO_DISCOVER_SCORE_BATCH_SIZE 个一次请求
+    unscored = [p for p in result if p.get('dark_horse_index') is None]
+    if unscored:
+        score_products_batch(unscored, region_key, region_flag)
+    for idx, p in enumerate(result):
         if 'dark_horse_index' not in p:
-            p = analyze_and_score(p)
-
-        result.append(p)
+            result[idx] = analyze_and_score(p)
 
     return result
 
 
+def _apply_score_result(product: dict, score_result: dict) -> None:
+    if not isinstance(score_result, dict) or not score_result:
+        return
+    score = score_result.get('dark_horse_index', score_result.get('score'))
+    product['dark_horse_index'] = score if score is not None else product.get('dark_horse_index', 2)
+    if 'reason' in score_result:
+        product['score_reason'] = score_result['reason']
+
+
+def score_products_batch(products: List[dict], region_key: str, region_flag: str) -> None:
+    """
+    批量评分（原地写回 dark_horse_index / score_reason）
+
+    按 name 对齐返回结果，name 对不上时按位置对齐；批量结果缺失的产品单独评分一次。
+    批量请求本身失败时不逐个重试（多半是同样的故障），留给调用方的 analyze_and_score 兜底。
+    """
+    batch_size = AUTO_DISCOVER_SCORE_BATCH_SIZE
+    for start in range(0, len(products), batch_size):
+        chunk = products[start:start + batch_size]
+        if len(chunk) == 1:
+            _apply_score_result(chunk[0], analyze_with_provider(
+                chunk[0], task="score", region_key=region_key, region_flag=region_flag))
+            continue
+
+        scores = analyze_with_provider(chunk, task="score_batch", region_key=region_key, region_flag=region_flag)
+        if not isinstance(scores, list):
+            print(f"  ⚠️ Batch scoring failed, leaving {len(chunk)} products for rule-based scoring")
+            continue
+        by_name = {
+            str(s.get('name', '')).strip().lower(): s
+            for s in scores if isinstance(s, dict) and s.get('name')
+        }
+        for idx, product in enumerate(chunk):
+            score_result = by_name.get(str(product.get('name', '')).strip().lower())
+            if score_result is None and len(scores) == len(chunk) and isinstance(scores[idx], dict):
+                score_result = scores[idx]
+            if score_result is None:
+                score_result = analyze_with_provider(
+                    product, task="score", region_key=region_key, region_flag=region_flag)
+            _apply_score_result(product, score_result)
+
+
 # 保持向后兼容的别名
 fetch_with_perplexity = fetch_with_provider
 
 
+_FUNDING_AMOUNT_RE = re.compile(r'\$?([\d.]+)\s*([BMK])?', re.I)
+_FUNDING_UNIT_MULTIPLIER = {'B': 1000, 'M': 1, 'K': 0.001}  # 换算成百万美元
+
+
 def analyze_and_score(product: dict) -> dict:
     """
     使用 AI 分析产品并评分
@@ -2304,19 +3121,14 @@ def analyze_and_score(product: dict) -> dict:
 
     # 解析融资金额
     funding_amount = 0
-    if funding:
-        match = re.search(r'\$?([\d.]+)\s*([BMK])?', funding, re.I)
+    if funding and any(c.isdigit() for c in funding):  # 大多数产品没有融资数字，跳过正则
+        match = _FUNDING_AMOUNT_RE.search(funding)
         if match:
-            amount = float(match.group(1))
-            unit = (match.group(2) or '').upper()
-            if unit == 'B':
-                funding_amount = amount * 1000
-            elif unit == 'M':
-                funding_amount = amount
-            elif unit == 'K':
-                funding_amount = amount / 1000
-            else:
-                funding_amount = amount
+            try:
+                amount = float(match.group(1))
+            except ValueError:  # "Series A. $10M" 先匹配到孤立的 "."
+                amount = 0
+            funding_amount = amount * _FUNDING_UNIT_MULTIPLIER.get((match.group(2) or '').upper(), 1)
 
     # 评分逻辑
     if funding_amount >= 100:
@@ -2362,11 +3174,14 @@ def _add_criteria(product: dict, tag: str) -> None:
         product['criteria_met'] = criteria
 
 
+_FUNDING_MUSD_RE = re.compile(r'\$?\s*([\d,.]+)\s*([BMK]?)', re.IGNORECASE)
+
+
 def _parse_funding_amount_musd(funding_text: str) -> float:
     text = str(funding_text or '').strip()
     if not text:
         return 0.0
-    match = re.search(r'\$?\s*([\d,.]+)\s*([BMK]?)', text, re.IGNORECASE)
+    match = _FUNDING_MUSD_RE.search(text)
     if not match:
         return 0.0
     try:
@@ -2429,7 +3244,7 @@ def _apply_demand_signals_and_guardrail(
         _add_criteria(product, tag)
 
     has_supply = _has_strong_supply_signal(product)
-    new_score, applied, reason = apply_demand_guardrail(
+    new_score, applied, reason = load_demand_signals().apply_demand_guardrail(
         llm_score=llm_score,
         demand_payload=demand_payload,
         has_strong_supply_signal=has_supply,
@@ -2449,46 +3264,123 @@ def _apply_demand_signals_and_guardrail(
     return new_score, applied
 
 
+@functools.lru_cache(maxsize=16)
+def _week_file_paths(dark_dir: str, rising_dir: str, week: str) -> Tuple[str, str]:
+    """(黑马周文件, 潜力股周文件)，同一周内只拼一次路径"""
+    return os.path.join(dark_dir, f'week_{week}.json'), os.path.join(rising_dir, f'global_{week}.json')
+
+
+@functools.lru_cache(maxsize=16)
+def _ensure_dir(path: str) -> None:
+    """每个目录每个进程只 makedirs 一次"""
+    os.makedirs(path, exist_ok=True)
+
+
+def _target_file_for_product(product: dict, week: str) -> Tuple[str, str]:
+    """根据评分返回 (目录, 周文件)：黑马 4-5 分，其余为潜力股"""
+    dark_path, rising_path = _week_file_paths(DARK_HORSES_DIR, RISING_STARS_DIR, week)
+    if product.get('dark_horse_index', 2) >= 4:
+        return DARK_HORSES_DIR, dark_path
+    return RISING_STARS_DIR, rising_path
+
+
 def save_product(product: dict, dry_run: bool = False):
     """保存产品到相应目录"""
-    score = product.get('dark_horse_index', 2)
-    week = get_current_week()
+    save_products_batch([product], dry_run)
 
-    if score >= 4:
-        # 黑马
-        target_dir = DARK_HORSES_DIR
-        target_file = os.path.join(target_dir, f'week_{week}.json')
-    else:
-        # 潜力股
-        target_dir = RISING_STARS_DIR
-        target_file = os.path.join(target_dir, f'global_{week}.json')
+
+def save_products_batch(products: List[dict], dry_run: bool = False) -> int:
+    """
+    批量保存产品：每个周文件只读写一次，products_featured.json 也只读写一次
+
+    Returns:
+        写入的产品数量
+    """
+    if not products:
+        return 0
+
+    week = get_current_week()
+    grouped: Dict[str, Tuple[str, List[dict]]] = {}
+    for product in products:
+        target_dir, target_file = _target_file_for_product(product, week)
+        grouped.setdefault(target_file, (target_dir, []))[1].append(product)
 
     if dry_run:
-        print(f"  [DRY RUN] Would save to: {target_file}")
-        print(f"  {json.dumps(product, ensure_ascii=False, indent=2)}")
-        return
+        for target_file, (_, file_products) in grouped.items():
+            for product in file_products:
+                print(f"  [DRY RUN] Would save to: {target_file}")
+                print(f"  {json.dumps(product, ensure_ascii=False, indent=2)}")
+        return 0
 
-    # 确保目录存在
-    os.makedirs(target_dir, exist_ok=True)
+    for target_file, (target_dir, file_products) in grouped.items():
+        # 确保目录存在
+        _ensure_dir(target_dir)
 
-    # 加载现有数据
-    if os.path.exists(target_file):
-        with open(target_file, 'r', encoding='utf-8') as f:
-            products = json.load(f)
-    else:
-        products = []
+        # 加载现有数据
+        if os.path.exists(target_file):
+            existing = load_json_file(target_file)
+        else:
+            existing = []
 
-    # 添加新产品
-    products.append(product)
+        existing.extend(file_products)
 
-    # 保存到分类文件
-    with open(target_file, 'w', encoding='utf-8') as f:
-        json.dump(products, f, ensure_ascii=False, indent=2)
+        # 保存到分类文件
+        dump_json_file(target_file, existing)
+
+        print(f"  Saved {len(file_products)} to: {target_file}")
 
-    print(f"  Saved to: {target_file}")
-    
     # 同时同步到 products_featured.json（前端数据源）
-    sync_to_featured(product)
+    sync_products_to_featured(products)
+    return len(products)
+
+
+def _featured_name_key(value: str) -> str:
+    if not value:
+        return ""
+    try:
+        return normalize_name(value) if callable(globals().get("normalize_name")) else "".join(
+            ch for ch in value.lower() if ch.isalnum()
+        )
+    except Exception:
+        return "".join(ch for ch in value.lower() if ch.isalnum())
+
+
+def _build_featured_product(product: dict) -> dict:
+    """转换字段格式（适配前端）"""
+    apply_country_fields(product, fallback_region_flag=str(product.get('source_region') or product.get('region') or '').strip())
+    now = datetime.utcnow()
+    return {
+        'name': product.get('name'),
+        'description': product.get('description'),
+        'description_en': product.get('description_en', ''),
+        'website': product.get('website'),
+        'logo_url': product.get('logo_url') or product.get('logo', ''),
+        'categories': [product.get('category', 'other')],
+        'dark_horse_index': product.get('dark_horse_index', 2),
+        'why_matters': product.get('why_matters', ''),
+        'why_matters_en': product.get('why_matters_en', ''),
+        'funding_total': product.get('funding_total', ''),
+        'latest_news': product.get('latest_news', ''),
+        'region': product.get('region', UNKNOWN_COUNTRY_DISPLAY),
+        'country_code': product.get('country_code', UNKNOWN_COUNTRY_CODE),
+        'country_name': product.get('country_name', UNKNOWN_COUNTRY_NAME),
+        'country_flag': product.get('country_flag', ''),
+        'country_display': product.get('country_display', UNKNOWN_COUNTRY_DISPLAY),
+        'country_source': product.get('country_source', 'unknown'),
+        'source_region': product.get('source_region', ''),
+        'source': product.get('source', 'auto_discover'),
+        'source_url': product.get('source_url', ''),
+        'source_title': product.get('source_title', ''),
+        'website_source': product.get('website_source', ''),
+        'latest_news_en': product.get('latest_news_en', ''),
+        'community_verdict': product.get('community_verdict'),
+        'extra': product.get('extra', {}) if isinstance(product.get('extra'), dict) else {},
+        'discovered_at': product.get('discovered_at', now.strftime('%Y-%m-%d')),
+        'first_seen': now.isoformat() + 'Z',
+        # 计算分数（用于排序）
+        'final_score': product.get('dark_horse_index', 2) * 20,
+        'trending_score': product.get('dark_horse_index', 2) * 18,
+    }
 
 
 def sync_to_featured(product: dict):
@@ -2497,88 +3389,58 @@ def sync_to_featured(product: dict):
     
     这样发现的产品可以直接在前端显示
     """
-    if product.get('dark_horse_index', 0) < 2:
-        print(f"  ⏭️ Skip featured (score < 2): {product.get('name')}")
-        return
+    sync_products_to_featured([product])
+
+
+def sync_products_to_featured(products: List[dict]) -> int:
+    """批量同步到 products_featured.json：读一次、去重、插入开头、写一次"""
+    candidates = []
+    for product in products:
+        if product.get('dark_horse_index', 0) < 2:
+            print(f"  ⏭️ Skip featured (score < 2): {product.get('name')}")
+            continue
+        candidates.append(product)
+    if not candidates:
+        return 0
+
     featured_file = os.path.join(PROJECT_ROOT, 'data', 'products_featured.json')
-    
+    synced = 0
     try:
         # 加载现有数据
         if os.path.exists(featured_file):
-            with open(featured_file, 'r', encoding='utf-8') as f:
-                featured = json.load(f)
+            featured = load_json_file(featured_file)
         else:
             featured = []
-        
+
         # 检查是否已存在（website 优先，其次 name）
         existing_websites = {normalize_url(p.get('website', '')) for p in featured}
-        def _safe_name_key(value: str) -> str:
-            if not value:
-                return ""
-            try:
-                return normalize_name(value) if callable(globals().get("normalize_name")) else "".join(
-                    ch for ch in value.lower() if ch.isalnum()
-                )
-            except Exception:
-                return "".join(ch for ch in value.lower() if ch.isalnum())
+        existing_names = {_featured_name_key(p.get('name', '')) for p in featured}
 
-        existing_names = {_safe_name_key(p.get('name', '')) for p in featured}
-        product_domain = normalize_url(product.get('website', ''))
-        product_name_key = _safe_name_key(product.get('name', ''))
+        for product in candidates:
+            product_domain = normalize_url(product.get('website', ''))
+            product_name_key = _featured_name_key(product.get('name', ''))
+
+            if product_domain and product_domain in existing_websites:
+                print(f"  📋 Already in featured (domain): {product.get('name')}")
+                continue
+            if (not product_domain) and product_name_key and product_name_key in existing_names:
+                print(f"  📋 Already in featured (name): {product.get('name')}")
+                continue
+
+            # 添加到列表开头（最新的在前面）
+            featured.insert(0, _build_featured_product(product))
+            existing_websites.add(product_domain)
+            existing_names.add(product_name_key)
+            synced += 1
+            print(f"  ✅ Synced to featured: {product.get('name')}")
+
+        if synced:
+            dump_json_file(featured_file, featured)
 
-        if product_domain and product_domain in existing_websites:
-            print(f"  📋 Already in featured (domain): {product.get('name')}")
-            return
-        if (not product_domain) and product_name_key and product_name_key in existing_names:
-            print(f"  📋 Already in featured (name): {product.get('name')}")
-            return
-        
-        # 转换字段格式（适配前端）
-        apply_country_fields(product, fallback_region_flag=str(product.get('source_region') or product.get('region') or '').strip())
-        featured_product = {
-            'name': product.get('name'),
-            'description': product.get('description'),
-            'description_en': product.get('description_en', ''),
-            'website': product.get('website'),
-            'logo_url': product.get('logo_url') or product.get('logo', ''),
-            'categories': [product.get('category', 'other')],
-            'dark_horse_index': product.get('dark_horse_index', 2),
-            'why_matters': product.get('why_matters', ''),
-            'why_matters_en': product.get('why_matters_en', ''),
-            'funding_total': product.get('funding_total', ''),
-            'latest_news': product.get('latest_news', ''),
-            'region': product.get('region', UNKNOWN_COUNTRY_DISPLAY),
-            'country_code': product.get('country_code', UNKNOWN_COUNTRY_CODE),
-            'country_name': product.get('country_name', UNKNOWN_COUNTRY_NAME),
-            'country_flag': product.get('country_flag', ''),
-            'country_display': product.get('country_display', UNKNOWN_COUNTRY_DISPLAY),
-            'country_source': product.get('country_source', 'unknown'),
-            'source_region': product.get('source_region', ''),
-            'source': product.get('source', 'auto_discover'),
-            'source_url': product.get('source_url', ''),
-            'source_title': product.get('source_title', ''),
-            'website_source': product.get('website_source', ''),
-            'latest_news_en': product.get('latest_news_en', ''),
-            'community_verdict': product.get('community_verdict'),
-            'extra': product.get('extra', {}) if isinstance(product.get('extra'), dict) else {},
-            'discovered_at': product.get('discovered_at', datetime.utcnow().strftime('%Y-%m-%d')),
-            'first_seen': datetime.utcnow().isoformat() + 'Z',
-            # 计算分数（用于排序）
-            'final_score': product.get('dark_horse_index', 2) * 20,
-            'trending_score': product.get('dark_horse_index', 2) * 18,
-        }
-        
-        # 添加到列表开头（最新的在前面）
-        featured.insert(0, featured_product)
-        
-        # 保存
-        with open(featured_file, 'w', encoding='utf-8') as f:
-            json.dump(featured, f, ensure_ascii=False, indent=2)
-        
-        print(f"  ✅ Synced to featured: {product.get('name')}")
-        
     except Exception as e:
         print(f"  ⚠️ Failed to sync to featured: {e}")
+        return 0
+    return synced
 
 
 def discover_from_source(source_key: str, dry_run: bool = False):
@@ -2597,7 +3459,7 @@ def discover_from_source(source_key: str, dry_run: bool = False):
     # 使用 Perplexity 发现产品
     products = fetch_with_perplexity(config)
 
-    new_count = 0
+    new_products = []
     for product in products:
         if is_duplicate(product.get('name', ''), product.get('website', ''), existing):
             print(f"  Skip duplicate: {product.get('name')}")
@@ -2607,11 +3469,13 @@ def discover_from_source(source_key: str, dry_run: bool = False):
         if 'dark_horse_index' not in product:
             product = analyze_and_score(product)
 
-        save_product(product, dry_run)
-        new_count += 1
+        new_products.append(product)
         existing.add(product.get('name', '').lower())
+        existing.update(fuzzy_duplicate_keys(product.get('name', ''), product.get('website', '')))
 
-    print(f"\n  Found {new_count} new products from {config['name']}")
+    # 每个周文件 / products_featured.json 只读写一次
+    save_products_batch(new_products, dry_run)
+    print(f"\n  Found {len(new_products)} new products from {config['name']}")
 
 
 def discover_all(dry_run: bool = False, tier: int = None):
@@ -2654,6 +3518,9 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
     keywords = apply_keyword_limit(region_key, keywords)
     if AUTO_DISCOVER_BUDGET_MODE == "adaptive":
         keywords = rank_keywords_by_yield(region_key, keywords, keyword_stats)
+        if AUTO_DISCOVER_KEYWORD_ORDER == "profit_per_cost":
+            keywords = rank_keywords_by_profit(region_key, keywords, keyword_stats)
+        keywords = prune_low_yield_keywords(region_key, keywords, keyword_stats)
 
     keyword_limit = 0
     if region_key == "cn" and MAX_KEYWORDS_CN > 0:
@@ -2675,23 +3542,27 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
         print(f"  🧯 Keyword limit: {keyword_limit}")
     print(f"{'='*60}")
 
+    if not PROVIDER_AVAILABLE.get(current_provider, False):
+        print(f"  ⛔ Provider {current_provider} unavailable (missing API key), skip {region_key}")
+        return {"error": f"Provider unavailable: {current_provider}"}
+
     # 使用增强去重检查器
     featured_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "products_featured.json")
     existing_products = []
     if os.path.exists(featured_path):
-        with open(featured_path, 'r', encoding='utf-8') as f:
-            existing_products = json.load(f)
+        existing_products = load_json_file(featured_path)
     
     dedup_checker = EnhancedDuplicateChecker(existing_products)
     all_products = []
-    quality_rejections = []
+    reason_counts: Counter = Counter()
     demand_engine = None
     demand_processed = 0
     demand_upgraded = 0
     demand_downgraded = 0
 
-    if ENABLE_DEMAND_SIGNALS and HAS_DEMAND_SIGNALS:
-        demand_engine = DemandSignalEngine(
+    demand_signals = load_demand_signals() if ENABLE_DEMAND_SIGNALS else None
+    if demand_signals:
+        demand_engine = demand_signals.DemandSignalEngine(
             window_days=DEMAND_WINDOW_DAYS,
             strict_x_official=True,
             official_handles_path=PRODUCT_OFFICIAL_HANDLES_FILE,
@@ -2716,24 +3587,20 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
     }
 
     deferred_keywords: List[Tuple[str, str, List[dict], str]] = []
-    region_flag_map = {
-        'us': '🇺🇸', 'cn': '🇨🇳', 'eu': '🇪🇺',
-        'jp': '🇯🇵🇰🇷', 'kr': '🇰🇷', 'sea': '🇸🇬'
-    }
-    region_flag = region_flag_map.get(region_key, '🌍')
+    recent_search_signatures: deque = deque(maxlen=AUTO_DISCOVER_NEAR_DUP_WINDOW)
+    extract_batch: List[Tuple[str, str, List[dict], str]] = []
+    save_buffer: List[dict] = []
+    seen_cache = open_discovery_seen_cache(dry_run)
+    region_flag = REGION_FLAG_MAP.get(region_key, '🌍')
 
-    def _run_extract_for_keyword(
+    def _prepare_search_text(
         keyword: str,
         keyword_type: str,
         search_results: List[dict],
         *,
         bypass_gate: bool = False,
-    ) -> Tuple[int, int, int]:
-        nonlocal demand_processed, demand_upgraded, demand_downgraded
-        keyword_saved = 0
-        keyword_dark_horses = 0
-        current_provider = get_provider_for_region(region_key)
-
+    ) -> str:
+        """过 analyze gate / 近重复检测，返回待抽取的 search_text（跳过时返回空串）"""
         gate_disabled_for_cn = (
             region_key == "cn" and AUTO_DISCOVER_CN_BYPASS_ANALYZE_GATE
         )
@@ -2742,26 +3609,58 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
             if not analyze_ok:
                 deferred_keywords.append((keyword, keyword_type, search_results, analyze_reason))
                 print(f"    ⏭️ Analyze gate skipped: {analyze_reason}")
-                return 0, 0, 0
+                return ""
 
         search_text = build_search_text(search_results)
         if not search_text.strip():
-            return 0, 0, 0
+            return ""
+
+        signature = search_text_signature(search_text)
+        near_dup_keyword = find_near_duplicate_search_text(signature, recent_search_signatures)
+        if near_dup_keyword:
+            print(f"    ⏭️ Near-dup search_text (≈ {near_dup_keyword[:40]}), skip extraction")
+            return ""
+        recent_search_signatures.append((signature, keyword))
+        return search_text
 
+    def _call_extract(search_text: str, keyword_type: str) -> Optional[list]:
+        """只做 LLM 抽取，不改共享状态（可在线程池中调用）；调用失败返回 None，与「抽到 0 个」区分"""
+        current_provider = get_provider_for_region(region_key)
         print(f"    📊 Extracting products with {current_provider}...")
         products = analyze_with_provider(
             search_text,
             "extract",
             region_key,
             region_flag,
-            product_type=keyword_type
+            product_type=keyword_type,
         )
         if not isinstance(products, list):
-            products = []
-
+            print("    ⚠️ Extraction failed")
+            return None
         print(f"    ✅ Extracted {len(products)} products")
-        stats["products_found"] += len(products)
+        return products
+
+    def _extract_products(search_text: str, keyword_type: str) -> Optional[list]:
+        products = _call_extract(search_text, keyword_type)
+        stats["products_found"] += len(products or [])
+        return products
+
+    def _save_extracted_products(
+        keyword: str,
+        keyword_type: str,
+        search_results: List[dict],
+        products: Optional[list],
+    ) -> Tuple[int, int]:
+        """products 为 None 表示抽取失败：不入库，也不把这批搜索结果记入已见缓存（下次重试）"""
+        nonlocal demand_processed, demand_upgraded, demand_downgraded
+        extracted = products is not None
+        products = products or []
+        keyword_saved = 0
+        keyword_dark_horses = 0
+        current_provider = get_provider_for_region(region_key)
 
+        discovered_at = datetime.utcnow().strftime('%Y-%m-%d')
+        discovery_method = f'{current_provider}_search'
         for product in products:
             name = product.get('name', '')
             if not name:
@@ -2787,7 +3686,7 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
                 )
                 if not xref_valid:
                     stats["quality_rejections"] += 1
-                    quality_rejections.append({"name": name, "reason": xref_reason})
+                    reason_counts[xref_reason] += 1
                     print(f"    🚫 Hallucination filter: {name} ({xref_reason})")
                     continue
 
@@ -2805,13 +3704,13 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
                 is_valid, reason = validate_product(product)
             if not is_valid:
                 stats["quality_rejections"] += 1
-                quality_rejections.append({"name": name, "reason": reason})
+                reason_counts[reason] += 1
                 print(f"    ❌ Quality fail: {name} ({reason})")
                 continue
 
             product['source_region'] = region_flag
-            product['discovered_at'] = datetime.utcnow().strftime('%Y-%m-%d')
-            product['discovery_method'] = f'{current_provider}_search'
+            product['discovered_at'] = discovered_at
+            product['discovery_method'] = discovery_method
             product['search_keyword'] = keyword
             apply_country_fields(product, fallback_region_flag=region_flag)
 
@@ -2847,13 +3746,7 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
             criteria = product.get('criteria_met', [])
             print(f"    📈 Score: {score}/5 | Criteria: {criteria}")
 
-            website = product.get('website', '')
-            if not dry_run and website and website.lower() != 'unknown':
-                if not verify_url_exists(website, timeout=5):
-                    print(f"    ⚠️ URL not accessible: {website}")
-                    product['needs_verification'] = True
-
-            save_product(product, dry_run)
+            save_buffer.append(product)
             stats["products_saved"] += 1
             keyword_saved += 1
 
@@ -2866,68 +3759,204 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
             dedup_checker.add_product(product)
             all_products.append(product)
 
-        return keyword_saved, keyword_dark_horses, len(products)
+        if extracted:
+            mark_search_results_seen(seen_cache, search_results, "saved" if keyword_saved else "rejected")
+        return keyword_saved, keyword_dark_horses
 
-    # 对每个关键词进行搜索
-    for i, keyword in enumerate(keywords, 1):
-        print(f"\n  [{i}/{len(keywords)}] Searching: {keyword[:50]}...")
-        keyword_type = resolve_keyword_type(keyword, region_key, product_type)
+    def _run_extract_for_keyword(
+        keyword: str,
+        keyword_type: str,
+        search_results: List[dict],
+        *,
+        bypass_gate: bool = False,
+    ) -> Tuple[int, int, int]:
+        search_text = _prepare_search_text(keyword, keyword_type, search_results, bypass_gate=bypass_gate)
+        if not search_text:
+            return 0, 0, 0
+        products = _extract_products(search_text, keyword_type)
+        saved_count, dark_count = _save_extracted_products(keyword, keyword_type, search_results, products)
+        return saved_count, dark_count, len(products or [])
 
-        search_results = search_with_provider(keyword, region_key, search_engine)
-        stats["search_results"] += len(search_results)
-        if not search_results:
-            update_keyword_yield_stats(
-                keyword_stats,
-                region_key=region_key,
-                keyword=keyword,
-                searches=1,
+    def _flush_extract_batch() -> None:
+        """批量抽取：多个关键词的 search_text 合并为一次 LLM 调用，再按来源分回各关键词"""
+        if not extract_batch:
+            return
+        batch = list(extract_batch)
+        extract_batch.clear()
+        keyword_type = batch[0][1]
+
+        products = None
+        if len(batch) > 1:
+            print(f"\n  📦 Batch extracting {len(batch)} keywords...")
+            combined_text = build_batch_search_text([(kw, text) for kw, _, _, text in batch])
+            current_provider = get_provider_for_region(region_key)
+            print(f"    📊 Extracting products with {current_provider}...")
+            products = analyze_with_provider(
+                combined_text,
+                "extract",
+                region_key,
+                region_flag,
+                product_type=keyword_type,
+                prompt_max_chars=AUTO_DISCOVER_PROMPT_MAX_CHARS * len(batch),
             )
-            continue
+            if isinstance(products, list):
+                print(f"    ✅ Extracted {len(products)} products")
+                stats["products_found"] += len(products)
+            else:
+                print("    ⚠️ Batch extract failed, falling back to per-keyword extraction")
+                products = None
 
-        saved_count, dark_count, extracted_count = _run_extract_for_keyword(
-            keyword,
-            keyword_type,
-            search_results,
-            bypass_gate=False,
-        )
-        update_keyword_yield_stats(
-            keyword_stats,
-            region_key=region_key,
-            keyword=keyword,
-            searches=1,
-            extracted=extracted_count,
-            saved=saved_count,
-            dark_horses=dark_count,
-        )
+        if products is None:
+            grouped = [_extract_products(text, kw_type) for _, kw_type, _, text in batch]
+        else:
+            grouped = assign_products_to_batch(products, [results for _, _, results, _ in batch])
 
-        current_provider = get_provider_for_region(region_key)
-        if current_provider == "glm" and GLM_KEYWORD_DELAY > 0 and i < len(keywords):
-            print(f"  ⏳ GLM cooldown: sleeping {GLM_KEYWORD_DELAY:.1f}s")
-            time.sleep(GLM_KEYWORD_DELAY)
-
-    # Analyze gate 保底回放：当本轮产出偏低时，回放被 gate 拦截的关键词
-    min_expected_saves = max(1, len(keywords) // 4)
-    if AUTO_DISCOVER_ENABLE_ANALYZE_GATE and deferred_keywords and stats["products_saved"] < min_expected_saves:
-        print(f"\n  ♻️ Replaying deferred keywords due to low yield ({stats['products_saved']} < {min_expected_saves})")
-        for keyword, keyword_type, search_results, reason in deferred_keywords:
-            print(f"  ↩ Replaying: {keyword[:50]}... (gate reason: {reason})")
-            saved_count, dark_count, extracted_count = _run_extract_for_keyword(
-                keyword,
-                keyword_type,
-                search_results,
-                bypass_gate=True,
-            )
+        for (keyword, kw_type, search_results, _), keyword_products in zip(batch, grouped):
+            saved_count, dark_count = _save_extracted_products(keyword, kw_type, search_results, keyword_products)
             update_keyword_yield_stats(
                 keyword_stats,
                 region_key=region_key,
                 keyword=keyword,
-                searches=0,
-                extracted=extracted_count,
+                searches=1,
+                extracted=len(keyword_products or []),
                 saved=saved_count,
                 dark_horses=dark_count,
             )
 
-    flush_keyword_yield_stats(keyword_stats)
+    try:
+        # 非 GLM 地区：先串行搜索/过 gate，抽取放到线程池并发，最后按关键词顺序入库
+        keyword_workers = 1
+        if AUTO_DISCOVER_BATCH_EXTRACT_SIZE <= 1 and current_provider != "glm":
+            keyword_workers = min(AUTO_DISCOVER_KEYWORD_WORKERS, len(keywords))
+        pending_extracts: List[Tuple[str, str, List[dict], str]] = []
+
+        # 对每个关键词进行搜索（Perplexity 地区先批量搜索）
+        prefetched_results = prefetch_search_results(keywords, region_key)
+        for i, keyword in enumerate(keywords, 1):
+            print(f"\n  [{i}/{len(keywords)}] Searching: {keyword[:50]}...")
+            keyword_type = resolve_keyword_type(keyword, region_key, product_type)
+
+            current_provider = get_provider_for_region(region_key)
+            if current_provider == "glm":
+                wait_for_glm_cooldown()
+            if keyword in prefetched_results:
+                search_results = prefetched_results[keyword]
+            else:
+                search_results = search_with_provider(keyword, region_key, search_engine)
+            stats["search_results"] += len(search_results)
+            search_results = fresh_search_results(seen_cache, keyword, region_key, search_results)
+            if not search_results:
+                update_keyword_yield_stats(
+                    keyword_stats,
+                    region_key=region_key,
+                    keyword=keyword,
+                    searches=1,
+                )
+                continue
+
+            if AUTO_DISCOVER_BATCH_EXTRACT_SIZE > 1:
+                search_text = _prepare_search_text(keyword, keyword_type, search_results)
+                if not search_text:
+                    update_keyword_yield_stats(
+                        keyword_stats,
+                        region_key=region_key,
+                        keyword=keyword,
+                        searches=1,
+                    )
+                else:
+                    # 软件/硬件 prompt 不同，类型切换时先抽取已缓冲的关键词
+                    if extract_batch and extract_batch[0][1] != keyword_type:
+                        _flush_extract_batch()
+                    extract_batch.append((keyword, keyword_type, search_results, search_text))
+                    if len(extract_batch) >= AUTO_DISCOVER_BATCH_EXTRACT_SIZE:
+                        _flush_extract_batch()
+            elif keyword_workers > 1:
+                search_text = _prepare_search_text(keyword, keyword_type, search_results)
+                if search_text:
+                    pending_extracts.append((keyword, keyword_type, search_results, search_text))
+                else:
+                    update_keyword_yield_stats(
+                        keyword_stats,
+                        region_key=region_key,
+                        keyword=keyword,
+                        searches=1,
+                    )
+            else:
+                saved_count, dark_count, extracted_count = _run_extract_for_keyword(
+                    keyword,
+                    keyword_type,
+                    search_results,
+                    bypass_gate=False,
+                )
+                update_keyword_yield_stats(
+                    keyword_stats,
+                    region_key=region_key,
+                    keyword=keyword,
+                    searches=1,
+                    extracted=extracted_count,
+                    saved=saved_count,
+                    dark_horses=dark_count,
+                )
+
+            if current_provider == "glm":
+                mark_glm_keyword_done()
+
+        _flush_extract_batch()
+
+        if pending_extracts:
+            print(f"\n  ⚡ Extracting {len(pending_extracts)} keywords with {keyword_workers} workers...")
+            with ThreadPoolExecutor(max_workers=keyword_workers) as executor:
+                extracted_lists = list(executor.map(
+                    lambda item: _call_extract(item[3], item[1]),
+                    pending_extracts,
+                ))
+            for (keyword, keyword_type, search_results, _), products in zip(pending_extracts, extracted_lists):
+                stats["products_found"] += len(products or [])
+                saved_count, dark_count = _save_extracted_products(keyword, keyword_type, search_results, products)
+                update_keyword_yield_stats(
+                    keyword_stats,
+                    region_key=region_key,
+                    keyword=keyword,
+                    searches=1,
+                    extracted=len(products or []),
+                    saved=saved_count,
+                    dark_horses=dark_count,
+                )
+
+        # Analyze gate 保底回放：当本轮产出偏低时，回放被 gate 拦截的关键词
+        min_expected_saves = max(1, len(keywords) // 4)
+        if AUTO_DISCOVER_ENABLE_ANALYZE_GATE and deferred_keywords and stats["products_saved"] < min_expected_saves:
+            print(f"\n  ♻️ Replaying deferred keywords due to low yield ({stats['products_saved']} < {min_expected_saves})")
+            for keyword, keyword_type, search_results, reason in deferred_keywords:
+                print(f"  ↩ Replaying: {keyword[:50]}... (gate reason: {reason})")
+                saved_count, dark_count, extracted_count = _run_extract_for_keyword(
+                    keyword,
+                    keyword_type,
+                    search_results,
+                    bypass_gate=True,
+                )
+                update_keyword_yield_stats(
+                    keyword_stats,
+                    region_key=region_key,
+                    keyword=keyword,
+                    searches=0,
+                    extracted=extracted_count,
+                    saved=saved_count,
+                    dark_horses=dark_count,
+                )
+
+        # 官网可访问性在入库前统一并发校验，不在逐个产品的循环里阻塞
+        if not dry_run:
+            mark_unreachable_websites(save_buffer)
+    finally:
+        # 中途异常/Ctrl-C 也把已接受的产品落盘，已经付出的搜索/LLM 成本不白费
+        save_products_batch(save_buffer, dry_run)
+        flush_keyword_yield_stats(keyword_stats)
+        if seen_cache is not None:
+            seen_cache.close()
+
+    # 之后只剩打印报告，先放锁让下一次调度可以开始
+    release_process_lock()
 
     # 打印统计
     print(f"\n{'='*60}")
@@ -2949,15 +3978,12 @@ def discover_by_region(region_key: str, dry_run: bool = False, product_type: str
             f"processed={demand_processed}, upgraded={demand_upgraded}, downgraded={demand_downgraded}"
         )
 
-    if quality_rejections:
+    if reason_counts:
         print(f"\n  Top rejection reasons:")
-        reason_counts = {}
-        for rej in quality_rejections:
-            reason = rej['reason']
-            reason_counts[reason] = reason_counts.get(reason, 0) + 1
-        for reason, count in sorted(reason_counts.items(), key=lambda x: -x[1])[:3]:
+        for reason, count in reason_counts.most_common(3):
             print(f"    - {reason}: {count}")
 
+    sys.stdout.flush()
     return stats
 
 
@@ -2990,18 +4016,20 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
     print(f"  💸 Budget Mode: {AUTO_DISCOVER_BUDGET_MODE}")
     print(f"  🧪 Analyze Gate: {'on' if AUTO_DISCOVER_ENABLE_ANALYZE_GATE else 'off'}")
     print(f"  🛟 Quality Fallback: {'on' if AUTO_DISCOVER_QUALITY_FALLBACK else 'off'}")
+    region_workers = AUTO_DISCOVER_REGION_WORKERS or len(REGION_CONFIG)
+    print(f"  🧵 Region Workers: {region_workers}")
     print(f"  📅 Keyword Pool: Day {datetime.now().weekday()} (0=Mon)")
-    glm_status = 'enabled' if (ZHIPU_API_KEY and USE_GLM_FOR_CN) else 'disabled'
-    pplx_status = 'enabled' if PERPLEXITY_API_KEY else 'missing key'
+    glm_status = 'enabled' if (PROVIDER_AVAILABLE['glm'] and USE_GLM_FOR_CN) else 'disabled'
+    pplx_status = 'enabled' if PROVIDER_AVAILABLE['perplexity'] else 'missing key'
     print(f"  🤖 Provider: Perplexity ({pplx_status}) | GLM-cn ({glm_status})")
     print("═"*70)
 
     # 初始化跟踪
     found = {"dark_horses": 0, "rising_stars": 0}
-    region_yield = {k: 0 for k in REGION_CONFIG.keys()}
-    provider_stats = {"perplexity": 0, "glm": 0}
+    region_yield: Counter = Counter({k: 0 for k in REGION_CONFIG.keys()})
+    provider_stats: Counter = Counter({"perplexity": 0, "glm": 0})
     duplicates_skipped = 0
-    quality_rejections = []
+    reason_counts: Counter = Counter()
     attempts = 0
     unique_domains = set()
     demand_processed = 0
@@ -3013,12 +4041,12 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
     featured_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "products_featured.json")
     existing_products = []
     if os.path.exists(featured_path):
-        with open(featured_path, 'r', encoding='utf-8') as f:
-            existing_products = json.load(f)
+        existing_products = load_json_file(featured_path)
 
     dedup_checker = EnhancedDuplicateChecker(existing_products)
-    if ENABLE_DEMAND_SIGNALS and HAS_DEMAND_SIGNALS:
-        demand_engine = DemandSignalEngine(
+    demand_signals = load_demand_signals() if ENABLE_DEMAND_SIGNALS else None
+    if demand_signals:
+        demand_engine = demand_signals.DemandSignalEngine(
             window_days=DEMAND_WINDOW_DAYS,
             strict_x_official=True,
             official_handles_path=PRODUCT_OFFICIAL_HANDLES_FILE,
@@ -3027,12 +4055,13 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
             github_max_star_pages=DEMAND_GITHUB_MAX_STAR_PAGES,
         )
 
-    region_flag_map = {
-        'us': '🇺🇸', 'cn': '🇨🇳', 'eu': '🇪🇺',
-        'jp': '🇯🇵🇰🇷', 'kr': '🇰🇷', 'sea': '🇸🇬'
-    }
     keyword_pools: Dict[str, List[str]] = {}
     keyword_cursors = {k: 0 for k in REGION_CONFIG.keys()}
+    recent_search_signatures: deque = deque(maxlen=AUTO_DISCOVER_NEAR_DUP_WINDOW)
+    signature_lock = threading.Lock()
+    save_buffer: List[dict] = []
+    seen_cache = open_discovery_seen_cache(dry_run)
+    round_deferred: Dict[str, List[Tuple[str, str, List[dict], str]]] = {}
     prev_round_region_saved = {k: 1 for k in REGION_CONFIG.keys()}
 
     def quotas_met():
@@ -3049,6 +4078,9 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
         pool = apply_keyword_limit(region_key, pool)
         if AUTO_DISCOVER_BUDGET_MODE == "adaptive":
             pool = rank_keywords_by_yield(region_key, pool, keyword_stats)
+            if AUTO_DISCOVER_KEYWORD_ORDER == "profit_per_cost":
+                pool = rank_keywords_by_profit(region_key, pool, keyword_stats)
+            pool = prune_low_yield_keywords(region_key, pool, keyword_stats)
         keyword_pools[region_key] = pool
         return pool
 
@@ -3071,34 +4103,44 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
         keyword_cursors[region_key] = end
         return selected
 
-    def process_keyword(
+    def fetch_keyword_candidates(
         *,
         region_key: str,
         search_engine: str,
         keyword: str,
         keyword_type: str,
         quota_remaining: Dict[str, int],
-        deferred_queue: List[Tuple[str, str, List[dict], str]],
         search_results_override: Optional[List[dict]] = None,
+        prefetched_results: Optional[List[dict]] = None,
         bypass_gate: bool = False,
-    ) -> int:
-        nonlocal duplicates_skipped, demand_processed, demand_upgraded, demand_downgraded
+    ) -> Dict[str, Any]:
+        """
+        I/O 阶段：搜索 → analyze gate → 近重复检测 → LLM 抽取
 
-        search_requests = 0
+        不修改配额/去重等共享状态，可以在工作线程里执行。
+        """
+        fetched: Dict[str, Any] = {
+            "keyword": keyword,
+            "keyword_type": keyword_type,
+            "search_results": [],
+            "products": [],
+            "search_requests": 0,
+            "deferred_reason": "",
+            "extracted": False,
+            "quota_skipped": False,
+        }
         if search_results_override is None:
-            search_results = search_with_provider(keyword, region_key, search_engine)
-            search_requests = 1
+            if prefetched_results is None:
+                search_results = search_with_provider(keyword, region_key, search_engine)
+            else:
+                search_results = list(prefetched_results)
+            fetched["search_requests"] = 1
+            search_results = fresh_search_results(seen_cache, keyword, region_key, search_results)
         else:
             search_results = list(search_results_override)
-
+        fetched["search_results"] = search_results
         if not search_results:
-            update_keyword_yield_stats(
-                keyword_stats,
-                region_key=region_key,
-                keyword=keyword,
-                searches=search_requests,
-            )
-            return 0
+            return fetched
 
         gate_disabled_for_cn = (
             region_key == "cn" and AUTO_DISCOVER_CN_BYPASS_ANALYZE_GATE
@@ -3106,27 +4148,29 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
         if AUTO_DISCOVER_ENABLE_ANALYZE_GATE and not bypass_gate and not gate_disabled_for_cn:
             analyze_ok, analyze_reason = should_analyze_search_results(search_results, keyword)
             if not analyze_ok:
-                deferred_queue.append((keyword, keyword_type, search_results, analyze_reason))
+                fetched["deferred_reason"] = analyze_reason
                 print(f"    ⏭️ Analyze gate skipped: {analyze_reason}")
-                update_keyword_yield_stats(
-                    keyword_stats,
-                    region_key=region_key,
-                    keyword=keyword,
-                    searches=search_requests,
-                )
-                return 0
+                return fetched
 
         search_text = build_search_text(search_results)
         if not search_text.strip():
-            update_keyword_yield_stats(
-                keyword_stats,
-                region_key=region_key,
-                keyword=keyword,
-                searches=search_requests,
-            )
-            return 0
-
-        region_flag = region_flag_map.get(region_key, '🌍')
+            return fetched
+
+        signature = search_text_signature(search_text)
+        with signature_lock:
+            near_dup_keyword = find_near_duplicate_search_text(signature, recent_search_signatures)
+            if not near_dup_keyword:
+                recent_search_signatures.append((signature, keyword))
+        if near_dup_keyword:
+            print(f"    ⏭️ Near-dup search_text (≈ {near_dup_keyword[:40]}), skip extraction")
+            return fetched
+
+        # 并发时其他关键词可能在搜索期间填满了配额，抽取前再查一次，省掉一次 LLM 调用
+        if quotas_met():
+            fetched["quota_skipped"] = True
+            return fetched
+
+        region_flag = REGION_FLAG_MAP.get(region_key, '🌍')
         products = analyze_with_provider(
             search_text,
             "extract",
@@ -3137,14 +4181,44 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
         )
         if not isinstance(products, list):
             products = []
+        else:
+            fetched["extracted"] = True
 
         print(f"    📦 Extracted: {len(products)} candidates")
+        fetched["products"] = products
+        return fetched
+
+    def commit_keyword_candidates(
+        fetched: Dict[str, Any],
+        *,
+        region_key: str,
+        deferred_queue: List[Tuple[str, str, List[dict], str]],
+    ) -> int:
+        """提交阶段：去重 → 校验 → 评分 → 配额 → 保存（读写共享状态，必须在主线程串行执行）"""
+        nonlocal duplicates_skipped, demand_processed, demand_upgraded, demand_downgraded
+
+        keyword = fetched["keyword"]
+        keyword_type = fetched["keyword_type"]
+        search_results = fetched["search_results"]
+        products = fetched["products"]
+        search_requests = fetched["search_requests"]
+        if fetched["deferred_reason"]:
+            deferred_queue.append((keyword, keyword_type, search_results, fetched["deferred_reason"]))
+        if fetched["quota_skipped"]:
+            # 没有抽取，不计入关键词产出统计（否则会被当成低产关键词剪掉）
+            return 0
+
+        region_flag = REGION_FLAG_MAP.get(region_key, '🌍')
         saved_count = 0
         dark_count = 0
         current_provider = get_provider_for_region(region_key)
+        discovered_at = datetime.utcnow().strftime('%Y-%m-%d')
+        discovery_method = f'{current_provider}_search'
+        quota_skipped = False
 
         for product in products:
             if quotas_met():
+                quota_skipped = True
                 break
 
             name = product.get('name', '')
@@ -3168,7 +4242,7 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
             if current_provider == "glm":
                 xref_valid, xref_reason = validate_against_search_results(product, search_results)
                 if not xref_valid:
-                    quality_rejections.append({"name": name, "reason": xref_reason})
+                    reason_counts[xref_reason] += 1
                     print(f"    🚫 Hallucination filter: {name} ({xref_reason})")
                     continue
 
@@ -3185,7 +4259,7 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
             else:
                 is_valid, reason = validate_product(product)
             if not is_valid:
-                quality_rejections.append({"name": name, "reason": reason})
+                reason_counts[reason] += 1
                 print(f"    ❌ Quality fail: {name} ({reason})")
                 continue
 
@@ -3219,22 +4293,24 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
 
             category = get_category(score)
             if found[category] >= DAILY_QUOTA[category]:
+                quota_skipped = True
                 print(f"    ⏭️ {category} quota full, skip: {name}")
                 continue
             if region_yield[region_key] >= REGION_MAX.get(region_key, 3):
+                quota_skipped = True
                 print(f"    ⏭️ Region max reached, skip: {name}")
                 continue
 
             product['source_region'] = region_flag
-            product['discovered_at'] = datetime.utcnow().strftime('%Y-%m-%d')
-            product['discovery_method'] = f'{current_provider}_search'
+            product['discovered_at'] = discovered_at
+            product['discovery_method'] = discovery_method
             product['search_keyword'] = keyword
             apply_country_fields(product, fallback_region_flag=region_flag)
-            save_product(product, dry_run)
+            save_buffer.append(product)
 
             found[category] += 1
             region_yield[region_key] += 1
-            provider_stats[current_provider] = provider_stats.get(current_provider, 0) + 1
+            provider_stats[current_provider] += 1
             dedup_checker.add_product(product)
             saved_count += 1
             if category == "dark_horses":
@@ -3247,6 +4323,10 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
             status_icon = "🦄" if category == "dark_horses" else "⭐"
             print(f"    {status_icon} SAVED: {name} (score={score}, {category}, {current_provider})")
 
+        # 因配额跳过的候选明天还可能入选，不记入已见缓存
+        if fetched.get("extracted") and not quota_skipped:
+            mark_search_results_seen(seen_cache, search_results, "saved" if saved_count else "rejected")
+
         update_keyword_yield_stats(
             keyword_stats,
             region_key=region_key,
@@ -3258,117 +4338,259 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
         )
         return saved_count
 
-    # 主发现循环
-    while not quotas_met() and attempts < MAX_ATTEMPTS:
-        attempts += 1
-        print(f"\n{'─'*70}")
-        print(f"  🔄 Round {attempts}/{MAX_ATTEMPTS}")
-        print(f"  Progress: DH {found['dark_horses']}/{DAILY_QUOTA['dark_horses']} | RS {found['rising_stars']}/{DAILY_QUOTA['rising_stars']}")
-        print(f"{'─'*70}")
+    def process_keyword(
+        *,
+        region_key: str,
+        search_engine: str,
+        keyword: str,
+        keyword_type: str,
+        quota_remaining: Dict[str, int],
+        deferred_queue: List[Tuple[str, str, List[dict], str]],
+        search_results_override: Optional[List[dict]] = None,
+        bypass_gate: bool = False,
+    ) -> int:
+        # 配额已满时直接返回，避免再付一次搜索 + LLM 抽取的成本
+        if quotas_met():
+            return 0
+        fetched = fetch_keyword_candidates(
+            region_key=region_key,
+            search_engine=search_engine,
+            keyword=keyword,
+            keyword_type=keyword_type,
+            quota_remaining=quota_remaining,
+            search_results_override=search_results_override,
+            bypass_gate=bypass_gate,
+        )
+        return commit_keyword_candidates(fetched, region_key=region_key, deferred_queue=deferred_queue)
 
-        round_region_saved = {k: 0 for k in REGION_CONFIG.keys()}
-        region_order = get_region_order()
+    def plan_region_round(region_key: str, attempt: int) -> List[str]:
+        """本轮该地区要跑的关键词（地区已满/provider 不可用/无关键词时返回空）"""
+        if not PROVIDER_AVAILABLE.get(get_provider_for_region(region_key), False):
+            print(f"\n  ⏭️ Skip {region_key}: provider {get_provider_for_region(region_key)} unavailable")
+            return []
+        if region_yield[region_key] >= REGION_MAX.get(region_key, 3):
+            print(f"\n  ⏭️ Skip {region_key}: region max reached ({region_yield[region_key]})")
+            return []
+        config = REGION_CONFIG[region_key]
+        keywords_this_round = select_keywords_for_round(region_key, attempt)
+        if not keywords_this_round:
+            print(f"\n  ⏭️ {config['name']} | no keywords in this round")
+            return []
+        current_provider = get_provider_for_region(region_key)
+        print(f"\n  📍 {config['name']} | Provider: {current_provider} | Keywords: {len(keywords_this_round)}")
+        return keywords_this_round
 
-        for region_key in region_order:
-            if region_yield[region_key] >= REGION_MAX.get(region_key, 3):
-                print(f"\n  ⏭️ Skip {region_key}: region max reached ({region_yield[region_key]})")
-                continue
-            if quotas_met():
-                break
+    def fetch_region_round(region_key: str, keywords_this_round: List[str], emit, stop_event=None) -> None:
+        """按顺序抓取一个地区本轮的关键词（GLM 关键词之间冷却），每个结果交给 emit 提交"""
+        search_engine = REGION_CONFIG[region_key]['search_engine']
+        current_provider = get_provider_for_region(region_key)
+        quota_remaining = {
+            "dark_horses": DAILY_QUOTA["dark_horses"] - found["dark_horses"],
+            "rising_stars": DAILY_QUOTA["rising_stars"] - found["rising_stars"],
+        }
+        prefetched = prefetch_search_results(keywords_this_round, region_key)
 
-            config = REGION_CONFIG[region_key]
-            region_name = config['name']
-            search_engine = config['search_engine']
-            current_provider = get_provider_for_region(region_key)
-            keywords_this_round = select_keywords_for_round(region_key, attempts)
-            if not keywords_this_round:
-                print(f"\n  ⏭️ {region_name} | no keywords in this round")
-                continue
+        def should_stop() -> bool:
+            return quotas_met() or (stop_event is not None and stop_event.is_set())
 
-            print(f"\n  📍 {region_name} | Provider: {current_provider} | Keywords: {len(keywords_this_round)}")
-            quota_remaining = {
-                "dark_horses": DAILY_QUOTA["dark_horses"] - found["dark_horses"],
-                "rising_stars": DAILY_QUOTA["rising_stars"] - found["rising_stars"],
-            }
-            deferred_keywords: List[Tuple[str, str, List[dict], str]] = []
+        def fetch_one(keyword: str) -> Optional[Dict[str, Any]]:
+            if should_stop():
+                return None
+            print(f"\n    🔍 Searching: {keyword[:50]}...")
+            return fetch_keyword_candidates(
+                region_key=region_key,
+                search_engine=search_engine,
+                keyword=keyword,
+                keyword_type=resolve_keyword_type(keyword, region_key, product_type),
+                quota_remaining=quota_remaining,
+                prefetched_results=prefetched.get(keyword),
+            )
 
-            for idx, keyword in enumerate(keywords_this_round, 1):
-                if quotas_met():
-                    break
-                print(f"\n    🔍 Searching: {keyword[:50]}...")
-                keyword_type = resolve_keyword_type(keyword, region_key, product_type)
-                saved = process_keyword(
+        keyword_workers = min(AUTO_DISCOVER_KEYWORD_WORKERS, len(keywords_this_round))
+        if current_provider != "glm" and keyword_workers > 1:
+            # 关键词的搜索/抽取并发执行，按关键词排名顺序提交，保持配额分配与串行一致
+            with ThreadPoolExecutor(max_workers=keyword_workers) as executor:
+                futures = [executor.submit(fetch_one, keyword) for keyword in keywords_this_round]
+                for future in futures:
+                    fetched = future.result()
+                    if fetched is None or should_stop():
+                        continue
+                    emit(region_key, fetched)
+            return
+
+        for keyword in keywords_this_round:
+            if should_stop():
+                break
+            if current_provider == "glm":
+                wait_for_glm_cooldown()
+            fetched = fetch_one(keyword)
+            if current_provider == "glm":
+                mark_glm_keyword_done()
+            if fetched is not None:
+                emit(region_key, fetched)
+
+    def replay_deferred_keywords(region_key: str, saved_in_round: int) -> int:
+        deferred_keywords = round_deferred.get(region_key) or []
+        if not (AUTO_DISCOVER_ENABLE_ANALYZE_GATE and deferred_keywords and saved_in_round == 0 and not quotas_met()):
+            return 0
+        print(f"    ♻️ Replaying deferred keywords for {region_key} (no saves in round)")
+        search_engine = REGION_CONFIG[region_key]['search_engine']
+        quota_remaining = {
+            "dark_horses": DAILY_QUOTA["dark_horses"] - found["dark_horses"],
+            "rising_stars": DAILY_QUOTA["rising_stars"] - found["rising_stars"],
+        }
+        replay_saved = 0
+        for keyword, keyword_type, cached_results, reason in deferred_keywords:
+            if quotas_met():
+                break
+            print(f"    ↩ Replaying: {keyword[:50]}... (gate reason: {reason})")
+            replay_saved += process_keyword(
+                region_key=region_key,
+                search_engine=search_engine,
+                keyword=keyword,
+                keyword_type=keyword_type,
+                quota_remaining=quota_remaining,
+                deferred_queue=[],
+                search_results_override=cached_results,
+                bypass_gate=True,
+            )
+        return replay_saved
+
+    try:
+        # 主发现循环
+        while not quotas_met() and attempts < MAX_ATTEMPTS:
+            attempts += 1
+            print(f"\n{'─'*70}")
+            print(f"  🔄 Round {attempts}/{MAX_ATTEMPTS}")
+            print(f"  Progress: DH {found['dark_horses']}/{DAILY_QUOTA['dark_horses']} | RS {found['rising_stars']}/{DAILY_QUOTA['rising_stars']}")
+            print(f"{'─'*70}")
+
+            round_region_saved = {k: 0 for k in REGION_CONFIG.keys()}
+            round_deferred = {k: [] for k in REGION_CONFIG.keys()}
+            region_order = get_region_order()
+
+            def commit_region_result(region_key: str, fetched: Dict[str, Any]) -> None:
+                round_region_saved[region_key] += commit_keyword_candidates(
+                    fetched,
                     region_key=region_key,
-                    search_engine=search_engine,
-                    keyword=keyword,
-                    keyword_type=keyword_type,
-                    quota_remaining=quota_remaining,
-                    deferred_queue=deferred_keywords,
+                    deferred_queue=round_deferred[region_key],
                 )
-                round_region_saved[region_key] += saved
 
-                if current_provider == "glm" and GLM_KEYWORD_DELAY > 0 and idx < len(keywords_this_round):
-                    print(f"    ⏳ GLM cooldown: sleeping {GLM_KEYWORD_DELAY:.1f}s")
-                    time.sleep(GLM_KEYWORD_DELAY)
+            if region_workers > 1:
+                # 各地区的搜索/抽取（网络 I/O）在线程里并发，提交阶段仍由主线程串行处理
+                round_plan = []
+                for region_key in region_order:
+                    if quotas_met():
+                        break
+                    keywords_this_round = plan_region_round(region_key, attempts)
+                    if keywords_this_round:
+                        round_plan.append((region_key, keywords_this_round))
+
+                results_queue = queue.Queue()
+                stop_event = threading.Event()
+
+                def run_region_worker(region_key: str, keywords_this_round: List[str]) -> None:
+                    try:
+                        fetch_region_round(
+                            region_key,
+                            keywords_this_round,
+                            lambda rk, fetched: results_queue.put((rk, fetched)),
+                            stop_event,
+                        )
+                    except Exception as e:
+                        print(f"    ⚠️ Region {region_key} fetch failed: {e}")
+                    finally:
+                        results_queue.put((region_key, None))
+
+                if round_plan:
+                    workers = min(region_workers, len(round_plan))
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        for region_key, keywords_this_round in round_plan:
+                            executor.submit(run_region_worker, region_key, keywords_this_round)
+                        pending = len(round_plan)
+                        try:
+                            while pending:
+                                region_key, fetched = results_queue.get()
+                                if fetched is None:
+                                    pending -= 1
+                                    continue
+                                commit_region_result(region_key, fetched)
+                                if quotas_met():
+                                    stop_event.set()
+                        except BaseException:
+                            # 提交出错/Ctrl-C：撤掉还没开始的地区，不再继续花搜索/LLM 成本
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            raise
+                        finally:
+                            # 正在跑的 worker 在下一个关键词前退出，with 退出时不会一直等它们跑完
+                            stop_event.set()
+
+                for region_key, _ in round_plan:
+                    round_region_saved[region_key] += replay_deferred_keywords(
+                        region_key, round_region_saved[region_key]
+                    )
+            else:
+                for region_key in region_order:
+                    if quotas_met():
+                        break
+                    keywords_this_round = plan_region_round(region_key, attempts)
+                    if not keywords_this_round:
+                        continue
+                    fetch_region_round(region_key, keywords_this_round, commit_region_result)
+                    round_region_saved[region_key] += replay_deferred_keywords(
+                        region_key, round_region_saved[region_key]
+                    )
+
+            prev_round_region_saved = round_region_saved
+            sys.stdout.flush()
 
-            if AUTO_DISCOVER_ENABLE_ANALYZE_GATE and deferred_keywords and round_region_saved[region_key] == 0 and not quotas_met():
-                print(f"    ♻️ Replaying deferred keywords for {region_key} (no saves in round)")
-                for keyword, keyword_type, cached_results, reason in deferred_keywords:
+        if (
+            AUTO_DISCOVER_BUDGET_MODE == "adaptive"
+            and AUTO_DISCOVER_QUALITY_FALLBACK
+            and not quotas_met()
+        ):
+            print("\n  🛟 Quality fallback: quotas unmet after adaptive rounds, replaying remaining keywords in legacy mode")
+            for region_key in get_region_order():
+                if quotas_met():
+                    break
+                if region_yield[region_key] >= REGION_MAX.get(region_key, 3):
+                    continue
+                if not PROVIDER_AVAILABLE.get(get_provider_for_region(region_key), False):
+                    continue
+                config = REGION_CONFIG[region_key]
+                search_engine = config['search_engine']
+                pool = get_keyword_pool(region_key)
+                cursor = keyword_cursors.get(region_key, 0)
+                remaining = pool[cursor:]
+                if not remaining:
+                    continue
+                quota_remaining = {
+                    "dark_horses": DAILY_QUOTA["dark_horses"] - found["dark_horses"],
+                    "rising_stars": DAILY_QUOTA["rising_stars"] - found["rising_stars"],
+                }
+                print(f"  ↪ {region_key}: fallback keywords={len(remaining)}")
+                for keyword in remaining:
                     if quotas_met():
                         break
-                    print(f"    ↩ Replaying: {keyword[:50]}... (gate reason: {reason})")
-                    saved = process_keyword(
+                    keyword_type = resolve_keyword_type(keyword, region_key, product_type)
+                    process_keyword(
                         region_key=region_key,
                         search_engine=search_engine,
                         keyword=keyword,
                         keyword_type=keyword_type,
                         quota_remaining=quota_remaining,
                         deferred_queue=[],
-                        search_results_override=cached_results,
-                        bypass_gate=True,
                     )
-                    round_region_saved[region_key] += saved
-
-        prev_round_region_saved = round_region_saved
-
-    if (
-        AUTO_DISCOVER_BUDGET_MODE == "adaptive"
-        and AUTO_DISCOVER_QUALITY_FALLBACK
-        and not quotas_met()
-    ):
-        print("\n  🛟 Quality fallback: quotas unmet after adaptive rounds, replaying remaining keywords in legacy mode")
-        for region_key in get_region_order():
-            if quotas_met():
-                break
-            if region_yield[region_key] >= REGION_MAX.get(region_key, 3):
-                continue
-            config = REGION_CONFIG[region_key]
-            search_engine = config['search_engine']
-            pool = get_keyword_pool(region_key)
-            cursor = keyword_cursors.get(region_key, 0)
-            remaining = pool[cursor:]
-            if not remaining:
-                continue
-            quota_remaining = {
-                "dark_horses": DAILY_QUOTA["dark_horses"] - found["dark_horses"],
-                "rising_stars": DAILY_QUOTA["rising_stars"] - found["rising_stars"],
-            }
-            print(f"  ↪ {region_key}: fallback keywords={len(remaining)}")
-            for keyword in remaining:
-                if quotas_met():
-                    break
-                keyword_type = resolve_keyword_type(keyword, region_key, product_type)
-                process_keyword(
-                    region_key=region_key,
-                    search_engine=search_engine,
-                    keyword=keyword,
-                    keyword_type=keyword_type,
-                    quota_remaining=quota_remaining,
-                    deferred_queue=[],
-                )
-            keyword_cursors[region_key] = len(pool)
+                keyword_cursors[region_key] = len(pool)
+    finally:
+        # 中途异常/Ctrl-C 也把已接受的产品落盘，已经付出的搜索/LLM 成本不白费
+        save_products_batch(save_buffer, dry_run)
+        flush_keyword_yield_stats(keyword_stats)
+        if seen_cache is not None:
+            seen_cache.close()
 
-    flush_keyword_yield_stats(keyword_stats)
+    # 之后只剩打印报告，先放锁让下一次调度可以开始
+    release_process_lock()
 
     # ═══════════════════════════════════════════════════════════════════
     # 生成详细报告
@@ -3389,23 +4611,21 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
     print(f"  Providers:  {', '.join(f'{k}: {v}' for k, v in provider_stats.items() if v > 0)}")
     print(f"  Total saved: {found['dark_horses'] + found['rising_stars']}")
     print(f"  Duplicates skipped: {duplicates_skipped}")
-    print(f"  Quality rejections: {len(quality_rejections)}")
+    quality_rejections = sum(reason_counts.values())
+    print(f"  Quality rejections: {quality_rejections}")
     if demand_engine:
         print(
             "  Demand signals: "
             f"processed={demand_processed}, upgraded={demand_upgraded}, downgraded={demand_downgraded}"
         )
 
-    if quality_rejections:
+    if reason_counts:
         print("\n  Quality rejection reasons:")
-        reason_counts = {}
-        for rej in quality_rejections:
-            reason = rej['reason']
-            reason_counts[reason] = reason_counts.get(reason, 0) + 1
-        for reason, count in sorted(reason_counts.items(), key=lambda x: -x[1])[:5]:
+        for reason, count in reason_counts.most_common(5):
             print(f"    - {reason}: {count}")
 
     print("═"*70)
+    sys.stdout.flush()
 
     # 返回报告数据
     return {
@@ -3413,11 +4633,11 @@ def discover_all_regions(dry_run: bool = False, product_type: str = "mixed") ->
         "found": found,
         "quota": DAILY_QUOTA,
         "attempts": attempts,
-        "region_yield": region_yield,
-        "provider_stats": provider_stats,
+        "region_yield": dict(region_yield),
+        "provider_stats": dict(provider_stats),
         "unique_domains": len(unique_domains),
         "duplicates_skipped": duplicates_skipped,
-        "quality_rejections": len(quality_rejections),
+        "quality_rejections": quality_rejections,
         "demand_processed": demand_processed,
         "demand_upgraded": demand_upgraded,
         "demand_downgraded": demand_downgraded,
@@ -3455,10 +4675,16 @@ def test_perplexity():
         ("cn", "AI融资 2026"),
     ]
 
-    for region, query in test_queries:
-        print(f"\n  📍 Testing region={region}: {query}")
-        results = perplexity_search(query, count=3, region=region)
+    # 各地区查询相互独立，并发发出，按顺序打印
+    with ThreadPoolExecutor(max_workers=len(test_queries)) as executor:
+        futures = [
+            executor.submit(perplexity_search, query, count=3, region=region)
+            for region, query in test_queries
+        ]
+        all_results = [future.result() for future in futures]
 
+    for (region, query), results in zip(test_queries, all_results):
+        print(f"\n  📍 Testing region={region}: {query}")
         if results:
             print(f"  ✅ Found {len(results)} results")
             for i, r in enumerate(results[:2], 1):
@@ -3541,10 +4767,11 @@ def test_provider_routing():
     print(f"  USE_GLM_FOR_CN: {USE_GLM_FOR_CN}")
     print()
 
-    for region in regions:
-        provider = get_provider_for_region(region)
-        icon = "🇨🇳" if provider == "glm" else "🌐"
-        print(f"    {region:5} → {provider:12} {icon}")
+    routing = {region: get_provider_for_region(region) for region in regions}
+    print("\n".join(
+        f"    {region:5} → {provider:12} {'🇨🇳' if provider == 'glm' else '🌐'}"
+        for region, provider in routing.items()
+    ))
 
     print("\n  ✅ Routing test completed!")
 
@@ -3673,6 +4900,9 @@ def main():
             print("   If you are sure it's stale, delete the lock file and retry.")
             return
 
+    configure_output_buffering()
+    clear_search_memo()
+
     # 发现功能
     if args.region:
         # 新方式：按地区搜索
@@ -83,6 +83,9 @@ DOMAIN_ALIASES = {
 # 域名规范化
 # ═══════════════════════════════════════════════════════════════════════════════
 
+_WWW_PREFIX_RE = re.compile(r'^www\.')
+
+
 def normalize_domain(url: str, include_path: bool = False) -> str:
     """
     规范化域名，用于去重
@@ -114,7 +117,7 @@ def normalize_domain(url: str, include_path: bool = False) -> str:
         domain = parsed.netloc.lower()
         
         # 移除 www.
-        domain = re.sub(r'^www\.', '', domain)
+        domain = _WWW_PREFIX_RE.sub('', domain)
         
         # 移除端口
         domain = domain.split(':')[0]
@@ -203,6 +206,25 @@ def extract_base_domain(domain: str) -> str:
 # 名称规范化
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# 常见后缀（按顺序逐个移除）
+_NAME_SUFFIX_RES = [
+    re.compile(suffix, re.IGNORECASE)
+    for suffix in (
+        r'\s*\(.*\)$',  # (xxx)
+        r'\s*-\s*ai$',
+        r'\s+ai$',
+        r'\s+inc\.?$',
+        r'\s+labs?$',
+        r'\s+corp\.?$',
+        r'\s+ltd\.?$',
+        r'\s+llc\.?$',
+        r'\s+gmbh$',
+        r'\s+co\.?$',
+    )
+]
+_NAME_PUNCT_RE = re.compile(r'[^\w\s]')
+
+
 def normalize_name(name: str) -> str:
     """
     规范化产品/公司名称
@@ -224,24 +246,11 @@ def normalize_name(name: str) -> str:
         return COMPANY_ALIASES[name]
     
     # 移除常见后缀
-    suffixes = [
-        r'\s*\(.*\)$',  # (xxx)
-        r'\s*-\s*ai$',
-        r'\s+ai$',
-        r'\s+inc\.?$',
-        r'\s+labs?$',
-        r'\s+corp\.?$',
-        r'\s+ltd\.?$',
-        r'\s+llc\.?$',
-        r'\s+gmbh$',
-        r'\s+co\.?$',
-    ]
-    
-    for suffix in suffixes:
-        name = re.sub(suffix, '', name, flags=re.IGNORECASE)
+    for suffix_re in _NAME_SUFFIX_RES:
+        name = suffix_re.sub('', name)
     
     # 移除特殊字符，保留字母数字空格
-    name = re.sub(r'[^\w\s]', '', name)
+    name = _NAME_PUNCT_RE.sub('', name)
     
     # 压缩空格
     name = ' '.join(name.split())
@@ -307,6 +316,9 @@ class DuplicateChecker:
         self.names: Set[str] = set()
         self.normalized_names: Set[str] = set()
         self.products_by_name: Dict[str, Dict] = {}  # 用于相似度检查时比较类别
+        # 相似度索引：category -> {name_lower: 规范化名称}
+        # 相似度命中要求类别相同，只需扫描同类别产品，且规范化名称只算一次
+        self._similar_by_category: Dict[str, Dict[str, str]] = {}
         
         for product in existing_products:
             self._add_to_index(product)
@@ -329,11 +341,20 @@ class DuplicateChecker:
         if name:
             name_lower = name.lower().strip()
             self.names.add(name_lower)
+            previous = self.products_by_name.get(name_lower)
+            if previous is not None:
+                bucket = self._similar_by_category.get(previous.get('category', ''))
+                if bucket:
+                    bucket.pop(name_lower, None)
             self.products_by_name[name_lower] = product
             
             normalized = normalize_name(name)
             if normalized:
                 self.normalized_names.add(normalized)
+
+            category = product.get('category', '')
+            if category:
+                self._similar_by_category.setdefault(category, {})[name_lower] = normalize_name(name_lower)
     
     def is_duplicate(self, product: Dict) -> Tuple[bool, Optional[str]]:
         """
@@ -368,13 +389,22 @@ class DuplicateChecker:
                 return True, f"规范化名称重复: {normalized}"
             
             # 3. 相似度检查（仅当类别相同时）
-            if self.check_similarity:
-                for existing_name, existing_product in self.products_by_name.items():
-                    sim = name_similarity(name, existing_name)
-                    if sim >= self.similarity_threshold:
-                        # 额外检查：类别是否相同
-                        existing_category = existing_product.get('category', '')
-                        if category and existing_category and category == existing_category:
+            if self.check_similarity and category:
+                candidates = self._similar_by_category.get(category)
+                if candidates:
+                    for existing_name, existing_normalized in candidates.items():
+                        if normalized == existing_normalized:
+                            sim = 1.0
+                        else:
+                            matcher = SequenceMatcher(None, normalized, existing_normalized)
+                            # real_quick_ratio/quick_ratio 是 ratio 的上界，先用它们快速排除
+                            if (
+                                matcher.real_quick_ratio() < self.similarity_threshold
+                                or matcher.quick_ratio() < self.similarity_threshold
+                            ):
+                                continue
+                            sim = matcher.ratio()
+                        if sim >= self.similarity_threshold:
                             return True, f"名称相似 ({sim:.0%}): {name} ≈ {existing_name}"
         
         return False, None
@@ -467,6 +497,11 @@ def _funding_to_number(funding_str: str) -> float:
         return 0
 
 
+_SLUG_PUNCT_RE = re.compile(r'[^\w\s-]')
+_SLUG_SPACE_RE = re.compile(r'[\s_]+')
+_SLUG_DASH_RE = re.compile(r'-+')
+
+
 def generate_slug(name: str) -> str:
     """
     从名称生成 slug
@@ -480,13 +515,13 @@ def generate_slug(name: str) -> str:
     slug = name.lower()
     
     # 替换特殊字符为连字符
-    slug = re.sub(r'[^\w\s-]', '', slug)
+    slug = _SLUG_PUNCT_RE.sub('', slug)
     
     # 空格转连字符
-    slug = re.sub(r'[\s_]+', '-', slug)
+    slug = _SLUG_SPACE_RE.sub('-', slug)
     
     # 移除多余连字符
-    slug = re.sub(r'-+', '-', slug)
+    slug = _SLUG_DASH_RE.sub('-', slug)
     
     # 移除首尾连字符
     slug = slug.strip('-')
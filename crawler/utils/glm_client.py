@@ -39,6 +39,16 @@ try:
 except Exception:
     def record_api_usage(**kwargs):
         return None
+try:
+    from utils.http_session import build_pooled_session, parse_json_response
+except Exception:
+    def build_pooled_session(**kwargs):
+        return requests.Session()
+
+    def parse_json_response(response):
+        return response.json()
+from utils.json_io import loads_json, loads_lenient
+from utils.rate_limiter import TokenBucket
 
 # ════════════════════════════════════════════════════════════════════════════════
 # 全局配置
@@ -50,10 +60,20 @@ GLM_SEARCH_ENGINE = os.environ.get('GLM_SEARCH_ENGINE', 'search_pro')  # search_
 API_RATE_LIMIT_DELAY = float(os.environ.get('API_RATE_LIMIT_DELAY', '2'))
 API_MAX_RETRIES = int(os.environ.get('API_MAX_RETRIES', '3'))
 API_RETRY_BACKOFF = float(os.environ.get('API_RETRY_BACKOFF', '2'))
+GLM_RATE_LIMIT_RPS = float(os.environ.get('GLM_RATE_LIMIT_RPS', '1'))  # <=0 不限流
+GLM_RATE_LIMIT_BURST = int(os.environ.get('GLM_RATE_LIMIT_BURST', '2'))
 GLM_THINKING_TYPE = os.environ.get('GLM_THINKING_TYPE', 'disabled')  # enabled/disabled
 GLM_CLEAR_THINKING = os.environ.get('GLM_CLEAR_THINKING', 'true').lower() == 'true'
 USE_GLM_FOR_CN = os.environ.get('USE_GLM_FOR_CN', 'true').lower() == 'true'
 
+# 进程内所有 GLMClient / 线程共享同一个令牌桶，按总 QPS 限流
+_GLM_BUCKET = TokenBucket(GLM_RATE_LIMIT_RPS, burst=GLM_RATE_LIMIT_BURST)
+
+# _extract_json 用到的正则（每次分析响应都会调用，模块加载时编译一次）
+_JSON_BLOCK_RE = re.compile(r'```json\s*([\s\S]*?)\s*```')
+_JSON_ARRAY_RE = re.compile(r'\[\s*\{[\s\S]*\}\s*\]')
+_JSON_OBJECT_RE = re.compile(r'\{\s*"[\s\S]*\}')
+
 # 独立 Web Search API 端点
 GLM_WEB_SEARCH_URL = "https://open.bigmodel.cn/api/paas/v4/web_search"
 
@@ -170,7 +190,7 @@ class GLMClient:
 
         if self.api_key:
             # Setup requests.Session for direct Web Search API
-            self._search_session = requests.Session()
+            self._search_session = build_pooled_session()
             self._search_session.headers.update({
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json",
@@ -189,8 +209,8 @@ class GLMClient:
         return self._search_session is not None or self._client is not None
 
     def _rate_limit(self):
-        """API 限流"""
-        time.sleep(API_RATE_LIMIT_DELAY)
+        """API 限流（请求前取令牌）"""
+        _GLM_BUCKET.acquire()
 
     def _is_rate_limited(self, error: Exception) -> bool:
         """判断是否触发限流"""
@@ -272,12 +292,13 @@ class GLMClient:
 
         last_error: Optional[Exception] = None
         for attempt in range(1, API_MAX_RETRIES + 1):
+            self._rate_limit()
             try:
                 resp = self._search_session.post(
                     GLM_WEB_SEARCH_URL, json=payload, timeout=30
                 )
                 resp.raise_for_status()
-                data = resp.json()
+                data = parse_json_response(resp)
                 input_tokens, output_tokens = self._extract_usage_tokens(data)
                 record_api_usage(
                     provider="glm",
@@ -324,8 +345,6 @@ class GLMClient:
                     continue
                 print(f"  ❌ GLM Web Search Error: {e}")
                 break
-            finally:
-                self._rate_limit()
 
         if last_error and (
             self._is_rate_limited(last_error)
@@ -368,7 +387,8 @@ class GLMClient:
         model: Optional[str] = None,
         temperature: float = 0.3,
         max_tokens: int = 4096,
-        top_p: Optional[float] = None
+        top_p: Optional[float] = None,
+        system_prompt: Optional[str] = None
     ) -> Union[dict, list, str]:
         """
         使用 GLM 模型分析内容
@@ -384,6 +404,7 @@ class GLMClient:
             temperature: 温度 (0-2，推荐 0.3 以获得稳定输出用于提取任务)
             max_tokens: 最大 token (GLM-4.7 支持最大 128K)
             top_p: 核采样参数 (可选，与 temperature 二选一)
+            system_prompt: 静态规则（作为 system 消息放在最前，便于命中 provider 前缀缓存）
 
         Returns:
             解析后的 JSON 或原始文本
@@ -393,10 +414,14 @@ class GLMClient:
 
         model = model or self.model
 
+        messages = [{"role": "user", "content": prompt}]
+        if system_prompt:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+
         # 构建请求参数
         request_params = {
             "model": model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": messages,
             "max_tokens": max_tokens,
             "thinking": {
                 "type": GLM_THINKING_TYPE,
@@ -412,6 +437,7 @@ class GLMClient:
 
         last_error: Optional[Exception] = None
         for attempt in range(1, API_MAX_RETRIES + 1):
+            self._rate_limit()
             try:
                 response = self._client.chat.completions.create(**request_params)
                 input_tokens, output_tokens = self._extract_usage_tokens(response)
@@ -435,8 +461,6 @@ class GLMClient:
                     continue
                 print(f"  ❌ GLM Analyze Error: {e}")
                 break
-            finally:
-                self._rate_limit()
 
         if last_error and self._is_rate_limited(last_error):
             print("  ⚠️ GLM analysis failed due to rate limit; consider reducing traffic or "
@@ -454,35 +478,40 @@ class GLMClient:
             return []
 
         # 尝试 ```json ... ``` 块
-        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', text)
+        json_match = _JSON_BLOCK_RE.search(text)
         if json_match:
             try:
-                return json.loads(json_match.group(1))
+                return loads_json(json_match.group(1))
             except json.JSONDecodeError:
                 pass
 
         # 尝试直接解析
         try:
-            return json.loads(text)
+            return loads_json(text)
         except json.JSONDecodeError:
             pass
 
         # 尝试找到 JSON 数组
-        array_match = re.search(r'\[\s*\{[\s\S]*\}\s*\]', text)
+        array_match = _JSON_ARRAY_RE.search(text)
         if array_match:
             try:
-                return json.loads(array_match.group())
+                return loads_json(array_match.group())
             except json.JSONDecodeError:
                 pass
 
         # 尝试找到 JSON 对象
-        object_match = re.search(r'\{\s*"[\s\S]*\}', text)
+        object_match = _JSON_OBJECT_RE.search(text)
         if object_match:
             try:
-                return json.loads(object_match.group())
+                return loads_json(object_match.group())
             except json.JSONDecodeError:
                 pass
 
+        # 宽松解析：截掉前后说明文字、去掉尾随逗号
+        salvaged = loads_lenient(text)
+        if salvaged is not None:
+            return salvaged
+
         # All parsing attempts failed — log and return empty list
         snippet = text[:200].replace('\n', ' ')
         print(f"  ⚠ _extract_json: could not parse response (first 200 chars): {snippet}")
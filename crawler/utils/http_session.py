@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+连接池化的 requests.Session
+
+Perplexity / GLM 客户端和 URL 校验共用同一套配置：
+- HTTPAdapter 连接池（多地区线程并发时复用 keep-alive 连接，省去重复 TLS 握手）
+- 连接错误（请求还没发出）由 urllib3 自动重试；读超时 / 5xx 只对 GET/HEAD 自动重试，
+  计费的 POST（搜索/LLM 调用）和 429 交给各客户端自己的重试逻辑，避免重试叠加、重复计费
+- JSON 响应优先用 orjson 解析（可选依赖，未安装时回退 response.json()）
+"""
+
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '10'))
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '20'))
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', '3'))
+HTTP_RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', '0.5'))
+
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+def build_retry(total: int = HTTP_MAX_RETRIES) -> Retry:
+    return Retry(
+        total=total,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),  # POST 不是幂等的，读超时重试会重复计费
+        raise_on_status=False,  # 重试用尽后返回最后的响应，由调用方 raise_for_status
+    )
+
+
+def build_pooled_session(max_retries: int = HTTP_MAX_RETRIES) -> requests.Session:
+    """创建挂载连接池 + 重试策略的 Session（max_retries=0 关闭自动重试）"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=build_retry(max_retries) if max_retries > 0 else 0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_json_response(response: requests.Response):
+    """解析 JSON 响应；orjson 解析失败时交给 response.json()，保持 requests 的异常类型"""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            pass
+    return response.json()
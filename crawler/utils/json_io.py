@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+JSON 文件读写
+
+周文件、products_featured.json、关键词统计每次保存都要整文件解析/序列化，
+orjson（可选依赖）比标准库 json 快数倍；未安装时回退到 json，输出格式一致
+（UTF-8 原文、2 空格缩进）。
+"""
+
+import json
+import re
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+
+
+def load_json_file(path: str) -> Any:
+    """读取 JSON 文件（解析失败抛 json.JSONDecodeError，orjson 的异常是其子类）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_json_file(path: str, obj: Any) -> None:
+    """写入 JSON 文件（ensure_ascii=False, indent=2）"""
+    if HAS_ORJSON:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
+def dumps_json_text(obj: Any) -> str:
+    """序列化为 2 空格缩进的 JSON 字符串（拼进评分 prompt 用，格式与 json.dumps(ensure_ascii=False, indent=2) 一致）"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def loads_json(text: str) -> Any:
+    """
+    解析 JSON 字符串：先走 orjson，失败再交给 json（NaN/Infinity 等 orjson 不接受的写法），
+    结果和异常类型都与 json.loads 一致
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+def loads_lenient(text: str) -> Optional[Union[dict, list]]:
+    """
+    宽松解析模型输出里的 JSON：截掉首尾说明文字、去掉尾随逗号
+
+    严格解析都失败时的最后一步，救回一次解析就省一次重新请求；仍失败返回 None。
+    """
+    if not text:
+        return None
+    starts = [i for i in (text.find('['), text.find('{')) if i >= 0]
+    end = max(text.rfind(']'), text.rfind('}'))
+    if not starts or end <= min(starts):
+        return None
+    candidate = text[min(starts):end + 1]
+    for attempt in (candidate, _TRAILING_COMMA_RE.sub(r'\1', candidate)):
+        try:
+            result = loads_json(attempt)
+        except ValueError:
+            continue
+        if isinstance(result, (dict, list)):
+            return result
+    return None
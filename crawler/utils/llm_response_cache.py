@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+LLM 响应磁盘缓存
+
+抽取/评分 prompt 由搜索结果文本和产品 JSON 拼成，重跑（含 dry-run）时大量
+prompt 与上次完全相同。这里按 sha256(provider, model, temperature, prompt)
+缓存解析后的 JSON，命中时直接返回，省掉网络往返和限流等待。
+
+- 与 seen_url_cache 相同：单连接、WAL 模式、线程安全
+- 只缓存非空结果（空结果可能是限流/解析失败，下次应重试）
+- 超过 TTL 的记录在打开时清理
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Union
+
+
+class LlmResponseCache:
+    """(provider, model, prompt) → 解析后 JSON 的持久化缓存"""
+
+    def __init__(self, path: str, ttl_days: int = 7):
+        self.path = path
+        self.ttl_seconds = max(0, int(ttl_days)) * 86400
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses("
+            "cache_key TEXT PRIMARY KEY, created_at INTEGER, payload TEXT)"
+        )
+        self.expire()
+
+    @staticmethod
+    def cache_key(provider: str, model: str, prompt: str, temperature: float = 0.0) -> str:
+        raw = f"{provider}\0{model}\0{temperature}\0{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def expire(self) -> int:
+        """删除超过 TTL 的记录，返回删除条数"""
+        if not self.ttl_seconds:
+            return 0
+        cutoff = int(time.time()) - self.ttl_seconds
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+        return cur.rowcount
+
+    def get(self, key: str) -> Optional[Union[dict, list]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM responses WHERE cache_key = ? LIMIT 1",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        payload, created_at = row
+        if self.ttl_seconds and created_at < int(time.time()) - self.ttl_seconds:
+            return None
+        try:
+            return json.loads(payload)
+        except (TypeError, ValueError):
+            return None
+
+    def put(self, key: str, value: Union[dict, list]) -> None:
+        if not value or not isinstance(value, (dict, list)):
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses(cache_key, created_at, payload) VALUES (?, ?, ?)",
+                (key, int(time.time()), payload),
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_llm_response_cache(path: str, ttl_days: int = 7) -> Optional[LlmResponseCache]:
+    """打开缓存；SQLite 不可用时返回 None，不影响主流程"""
+    try:
+        return LlmResponseCache(path, ttl_days=ttl_days)
+    except (sqlite3.Error, OSError) as e:
+        print(f"  ⚠️ LLM response cache unavailable: {e}")
+        return None
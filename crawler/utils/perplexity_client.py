@@ -29,7 +29,6 @@ Usage:
 
 import os
 import json
-import time
 import re
 from typing import Optional, Union
 from dataclasses import dataclass, field
@@ -39,6 +38,16 @@ try:
 except Exception:
     def record_api_usage(**kwargs):
         return None
+try:
+    from utils.http_session import build_pooled_session, parse_json_response
+except Exception:
+    def build_pooled_session(**kwargs):
+        return requests.Session()
+
+    def parse_json_response(response):
+        return response.json()
+from utils.json_io import loads_json, loads_lenient
+from utils.rate_limiter import TokenBucket
 
 # ════════════════════════════════════════════════════════════════════════════════
 # 全局配置
@@ -46,10 +55,19 @@ except Exception:
 
 PERPLEXITY_API_KEY = os.environ.get('PERPLEXITY_API_KEY', '')
 PERPLEXITY_MODEL = os.environ.get('PERPLEXITY_MODEL', 'sonar')  # sonar / sonar-pro
-API_RATE_LIMIT_DELAY = float(os.environ.get('API_RATE_LIMIT_DELAY', '2'))
+PERPLEXITY_RATE_LIMIT_RPS = float(os.environ.get('PERPLEXITY_RATE_LIMIT_RPS', '5'))  # <=0 不限流
+PERPLEXITY_RATE_LIMIT_BURST = int(os.environ.get('PERPLEXITY_RATE_LIMIT_BURST', '5'))
+
+# 进程内所有 PerplexityClient / 线程共享同一个令牌桶，按总 QPS 限流
+_PPLX_BUCKET = TokenBucket(PERPLEXITY_RATE_LIMIT_RPS, burst=PERPLEXITY_RATE_LIMIT_BURST)
+
+# _extract_json 用到的正则（每次分析响应都会调用，模块加载时编译一次）
+_JSON_BLOCK_RE = re.compile(r'```json\s*([\s\S]*?)\s*```')
+_JSON_ARRAY_RE = re.compile(r'\[\s*\{[\s\S]*\}\s*\]')
 
 # API 端点
 SEARCH_API_URL = "https://api.perplexity.ai/search"
+MAX_QUERIES_PER_SEARCH = 5  # Search API 单次请求最多 5 个 query
 CHAT_API_URL = "https://api.perplexity.ai/chat/completions"
 
 # 地区配置
@@ -122,7 +140,7 @@ class PerplexityClient:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or PERPLEXITY_API_KEY
         self.model = PERPLEXITY_MODEL
-        self._session = requests.Session()
+        self._session = build_pooled_session()
         
         if self.api_key:
             self._session.headers.update({
@@ -137,8 +155,8 @@ class PerplexityClient:
         return bool(self.api_key)
     
     def _rate_limit(self):
-        """API 限流"""
-        time.sleep(API_RATE_LIMIT_DELAY)
+        """API 限流（请求前取令牌）"""
+        _PPLX_BUCKET.acquire()
 
     @staticmethod
     def _extract_usage_tokens(payload: dict) -> tuple[int, int]:
@@ -200,6 +218,97 @@ class PerplexityClient:
         
         print(f"  🔍 Perplexity Search: {query[:50]}...")
         
+        payload = self._build_search_payload(
+            query,
+            max_results=max_results,
+            country=country,
+            language_filter=language_filter,
+            domain_filter=domain_filter,
+            recency_filter=recency_filter,
+            max_tokens_per_page=max_tokens_per_page,
+        )
+        
+        try:
+            data = self._post_search(payload)
+            results = self._parse_search_items(data.get("results", []))
+            print(f"  ✅ Found {len(results)} results")
+            return results
+            
+        except requests.exceptions.RequestException as e:
+            print(f"  ❌ Search Error: {e}")
+            return []
+
+    def search_many(
+        self,
+        queries: list[str],
+        max_results: int = 10,
+        country: Optional[str] = None,
+        language_filter: Optional[list] = None,
+        domain_filter: Optional[list] = None,
+        recency_filter: Optional[str] = None,
+        max_tokens_per_page: int = 2048
+    ) -> Optional[list[list[SearchResult]]]:
+        """
+        多查询搜索：一次请求最多 MAX_QUERIES_PER_SEARCH 个 query
+
+        Returns:
+            与 queries 对齐的结果列表；请求失败或响应不是按 query 分组时返回 None（调用方应逐条回退）
+        """
+        if not self.api_key or not queries:
+            return None
+        if len(queries) == 1:
+            return [self.search(
+                queries[0],
+                max_results=max_results,
+                country=country,
+                language_filter=language_filter,
+                domain_filter=domain_filter,
+                recency_filter=recency_filter,
+                max_tokens_per_page=max_tokens_per_page,
+            )]
+
+        queries = list(queries)[:MAX_QUERIES_PER_SEARCH]
+        print(f"  🔍 Perplexity Search (batch {len(queries)}): {queries[0][:40]}...")
+
+        payload = self._build_search_payload(
+            queries,
+            max_results=max_results,
+            country=country,
+            language_filter=language_filter,
+            domain_filter=domain_filter,
+            recency_filter=recency_filter,
+            max_tokens_per_page=max_tokens_per_page,
+        )
+
+        try:
+            data = self._post_search(payload)
+            groups = data.get("results", [])
+            # 多查询响应按 query 分组（list of lists）；否则无法对应回关键词
+            if (
+                not isinstance(groups, list)
+                or len(groups) != len(queries)
+                or not all(isinstance(group, list) for group in groups)
+            ):
+                print("  ⚠️ Batch search response not grouped by query")
+                return None
+            grouped = [self._parse_search_items(group) for group in groups]
+            print(f"  ✅ Found {sum(len(g) for g in grouped)} results for {len(queries)} queries")
+            return grouped
+
+        except requests.exceptions.RequestException as e:
+            print(f"  ❌ Search Error: {e}")
+            return None
+
+    @staticmethod
+    def _build_search_payload(
+        query: Union[str, list],
+        max_results: int,
+        country: Optional[str],
+        language_filter: Optional[list],
+        domain_filter: Optional[list],
+        recency_filter: Optional[str],
+        max_tokens_per_page: int,
+    ) -> dict:
         payload = {
             "query": query,
             "max_results": min(max_results, 20),
@@ -215,37 +324,36 @@ class PerplexityClient:
             payload["search_domain_filter"] = domain_filter[:20]
         if recency_filter and recency_filter in ["day", "week", "month", "year"]:
             payload["search_recency_filter"] = recency_filter
-        
-        try:
-            response = self._session.post(SEARCH_API_URL, json=payload, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            input_tokens, output_tokens = self._extract_usage_tokens(data)
-            record_api_usage(
-                provider="perplexity",
-                search_requests=1,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-            )
-            
-            results = []
-            for item in data.get("results", []):
-                results.append(SearchResult(
-                    title=item.get("title", ""),
-                    url=item.get("url", ""),
-                    snippet=item.get("snippet", ""),
-                    date=item.get("date"),
-                    last_updated=item.get("last_updated")
-                ))
-            
-            print(f"  ✅ Found {len(results)} results")
-            return results
-            
-        except requests.exceptions.RequestException as e:
-            print(f"  ❌ Search Error: {e}")
-            return []
-        finally:
-            self._rate_limit()
+        return payload
+
+    def _post_search(self, payload: dict) -> dict:
+        self._rate_limit()
+        response = self._session.post(SEARCH_API_URL, json=payload, timeout=30)
+        response.raise_for_status()
+        data = parse_json_response(response)
+        input_tokens, output_tokens = self._extract_usage_tokens(data)
+        record_api_usage(
+            provider="perplexity",
+            search_requests=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+        )
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def _parse_search_items(items: list) -> list[SearchResult]:
+        results = []
+        for item in items or []:
+            if not isinstance(item, dict):
+                continue
+            results.append(SearchResult(
+                title=item.get("title", ""),
+                url=item.get("url", ""),
+                snippet=item.get("snippet", ""),
+                date=item.get("date"),
+                last_updated=item.get("last_updated")
+            ))
+        return results
     
     def search_by_region(
         self,
@@ -271,6 +379,24 @@ class PerplexityClient:
             recency_filter=config.get("recency", "week"),
             **kwargs
         )
+
+    def search_many_by_region(
+        self,
+        queries: list[str],
+        region: str,
+        max_results: int = 10,
+        **kwargs
+    ) -> Optional[list[list[SearchResult]]]:
+        """按地区的多查询搜索（参数同 search_by_region）"""
+        config = REGION_CONFIG.get(region, REGION_CONFIG["us"])
+        return self.search_many(
+            queries,
+            max_results=max_results,
+            country=config.get("country"),
+            language_filter=config.get("languages"),
+            recency_filter=config.get("recency", "week"),
+            **kwargs
+        )
     
     # ════════════════════════════════════════════════════════════════════════════
     # Chat Completions API (第二步：分析内容)
@@ -281,7 +407,8 @@ class PerplexityClient:
         prompt: str,
         model: Optional[str] = None,
         temperature: float = 0.3,
-        max_tokens: int = 4096
+        max_tokens: int = 4096,
+        system_prompt: Optional[str] = None
     ) -> Union[dict, list, str]:
         """
         使用 Sonar 模型分析内容
@@ -293,6 +420,7 @@ class PerplexityClient:
             model: 模型 (sonar/sonar-pro)
             temperature: 温度 (0-2，推荐 0.3 以获得稳定输出)
             max_tokens: 最大 token
+            system_prompt: 静态规则（作为 system 消息放在最前，便于命中 provider 前缀缓存）
             
         Returns:
             解析后的 JSON 或原始文本
@@ -302,17 +430,22 @@ class PerplexityClient:
         
         model = model or self.model
         
+        messages = [{"role": "user", "content": prompt}]
+        if system_prompt:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+
         payload = {
             "model": model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens
         }
         
         try:
+            self._rate_limit()
             response = self._session.post(CHAT_API_URL, json=payload, timeout=60)
             response.raise_for_status()
-            data = response.json()
+            data = parse_json_response(response)
             input_tokens, output_tokens = self._extract_usage_tokens(data)
             record_api_usage(
                 provider="perplexity",
@@ -327,8 +460,6 @@ class PerplexityClient:
         except requests.exceptions.RequestException as e:
             print(f"  ❌ Analyze Error: {e}")
             return {}
-        finally:
-            self._rate_limit()
     
     def _extract_json(self, text: str) -> Union[dict, list, str]:
         """从文本中提取 JSON.
@@ -341,27 +472,32 @@ class PerplexityClient:
             return []
 
         # 尝试 ```json ... ``` 块
-        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', text)
+        json_match = _JSON_BLOCK_RE.search(text)
         if json_match:
             try:
-                return json.loads(json_match.group(1))
+                return loads_json(json_match.group(1))
             except json.JSONDecodeError:
                 pass
 
         # 尝试直接解析
         try:
-            return json.loads(text)
+            return loads_json(text)
         except json.JSONDecodeError:
             pass
 
         # 尝试找到 JSON 数组
-        array_match = re.search(r'\[\s*\{[\s\S]*\}\s*\]', text)
+        array_match = _JSON_ARRAY_RE.search(text)
         if array_match:
             try:
-                return json.loads(array_match.group())
+                return loads_json(array_match.group())
             except json.JSONDecodeError:
                 pass
 
+        # 宽松解析：截掉前后说明文字、去掉尾随逗号
+        salvaged = loads_lenient(text)
+        if salvaged is not None:
+            return salvaged
+
         # All parsing attempts failed — log and return empty list
         snippet = text[:200].replace('\n', ' ')
         print(f"  ⚠ _extract_json: could not parse response (first 200 chars): {snippet}")
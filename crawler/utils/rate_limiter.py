@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+线程安全的令牌桶限流器
+
+替代每次请求后固定 sleep(API_RATE_LIMIT_DELAY)：请求前取令牌，
+低于速率时不等待，突发最多 burst 个请求，多线程共享同一个桶时按总 QPS 限流。
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """令牌桶：rate_per_sec 个/秒补充，容量 burst"""
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.rate_per_sec = max(float(rate_per_sec), 0.0)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_sec)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.rate_per_sec <= 0:
+                return True
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> float:
+        """阻塞直到拿到一个令牌，返回等待秒数（rate_per_sec<=0 表示不限流）"""
+        if self.rate_per_sec <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate_per_sec
+            time.sleep(wait)
+            waited += wait
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+跨运行的已见 URL 缓存
+
+每日 cron 重复搜到的新闻/搜索结果 URL，上次已经过 LLM 抽取（保存或被拒），
+再次送入抽取只会重复付费。这里用 SQLite 记录处理过的 URL（按规范化 URL 的
+blake2b 哈希），下次运行前先过滤掉。
+
+- 单进程一个连接，WAL 模式，写入 INSERT OR IGNORE
+- 超过 TTL 的记录在打开时清理，过期后允许重新抽取
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+
+class SeenUrlCache:
+    """已处理 URL 的持久化集合（线程安全）"""
+
+    def __init__(self, path: str, ttl_days: int = 30):
+        self.path = path
+        self.ttl_seconds = max(0, int(ttl_days)) * 86400
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen("
+            "url_hash BLOB PRIMARY KEY, first_seen INTEGER, reason TEXT)"
+        )
+        self.expire()
+
+    @staticmethod
+    def url_hash(normalized_url: str) -> bytes:
+        return hashlib.blake2b(normalized_url.encode("utf-8"), digest_size=16).digest()
+
+    def expire(self) -> int:
+        """删除超过 TTL 的记录，返回删除条数"""
+        if not self.ttl_seconds:
+            return 0
+        cutoff = int(time.time()) - self.ttl_seconds
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM seen WHERE first_seen < ?", (cutoff,))
+        return cur.rowcount
+
+    def contains(self, normalized_url: str) -> bool:
+        if not normalized_url:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen WHERE url_hash = ? LIMIT 1",
+                (self.url_hash(normalized_url),),
+            ).fetchone()
+        return row is not None
+
+    def add_many(self, normalized_urls: Iterable[str], reason: str = "") -> None:
+        now = int(time.time())
+        rows = [(self.url_hash(url), now, reason) for url in set(normalized_urls) if url]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen(url_hash, first_seen, reason) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_seen_url_cache(path: str, ttl_days: int = 30) -> Optional[SeenUrlCache]:
+    """打开缓存；SQLite 不可用（只读目录、损坏文件等）时返回 None，不影响主流程"""
+    try:
+        return SeenUrlCache(path, ttl_days=ttl_days)
+    except (sqlite3.Error, OSError) as e:
+        print(f"  ⚠️ Seen-URL cache unavailable: {e}")
+        return None
+
@@ -7,10 +7,15 @@ Run:
 
 from __future__ import annotations
 
+import itertools
 import os
 import sys
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
 
 
 def _ensure_import_paths() -> None:
@@ -102,6 +107,601 @@ class TestAutoDiscoverBudgetHelpers(unittest.TestCase):
         self.assertIn("abcdefghij", out)
         self.assertNotIn("abcdefghijk", out)
 
+    def test_build_search_text_caps_result_count(self) -> None:
+        import tools.auto_discover as ad
+
+        results = [{"title": f"T{i}", "url": f"https://e.com/{i}", "content": "x"} for i in range(5)]
+        out = ad.build_search_text(results, max_results=3)
+        self.assertIn("### T2", out)
+        self.assertNotIn("### T3", out)
+
+    def test_near_duplicate_search_text_detection(self) -> None:
+        from collections import deque
+
+        import tools.auto_discover as ad
+
+        base = "### Acme AI raised Series A\nURL: https://a.com/1\nAcme AI launched an agent platform for sales teams"
+        recent = deque(maxlen=4)
+        recent.append((ad.search_text_signature(base), "acme funding"))
+
+        self.assertEqual(
+            ad.find_near_duplicate_search_text(ad.search_text_signature(base), recent, threshold=0.9),
+            "acme funding",
+        )
+        other = "### Beta Robotics unveils humanoid\nURL: https://b.com/2\nBeta Robotics released a home robot"
+        self.assertEqual(
+            ad.find_near_duplicate_search_text(ad.search_text_signature(other), recent, threshold=0.9),
+            "",
+        )
+        self.assertEqual(
+            ad.find_near_duplicate_search_text(ad.search_text_signature(base), recent, threshold=0),
+            "",
+        )
+
+    def test_assign_products_to_batch_by_source_and_name(self) -> None:
+        import tools.auto_discover as ad
+
+        group_a = [{"title": "Acme AI raises $10M", "url": "https://news.com/acme", "content": "Acme AI"}]
+        group_b = [{"title": "Nova Robotics launches", "url": "https://news.com/nova", "content": "Nova Robotics"}]
+        products = [
+            {"name": "Nova Robotics"},
+            {"name": "Acme AI", "source_url": "https://news.com/acme"},
+            {"name": "Unrelated"},
+        ]
+        assigned = ad.assign_products_to_batch(products, [group_a, group_b])
+        self.assertEqual([p["name"] for p in assigned[0]], ["Acme AI", "Unrelated"])
+        self.assertEqual([p["name"] for p in assigned[1]], ["Nova Robotics"])
+
+        text = ad.build_batch_search_text([("k1", "body1"), ("k2", "body2")])
+        self.assertIn("## Block 1 (keyword=k1)\nbody1", text)
+        self.assertIn("## Block 2 (keyword=k2)\nbody2", text)
+
+    def test_rank_keywords_by_profit_uses_saved_per_search(self) -> None:
+        import tools.auto_discover as ad
+
+        stats = {
+            "keywords": {
+                "us": {
+                    "low": {"searches": 10, "saved": 1},
+                    "high": {"searches": 2, "saved": 2},
+                    "mid": {"searches": 4, "saved": 2},
+                }
+            }
+        }
+        ranked = ad.rank_keywords_by_profit("us", ["low", "new", "mid", "high"], stats)
+        # 新关键词取平均收益 (0.1 + 1.0 + 0.5) / 3 ≈ 0.53，排在 mid 之前
+        self.assertEqual(ranked, ["high", "new", "mid", "low"])
+        self.assertEqual(ad.rank_keywords_by_profit("cn", ["a", "b"], stats), ["a", "b"])
+
+    def test_save_products_batch_writes_each_file_once(self) -> None:
+        import json
+
+        import tools.auto_discover as ad
+
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "data"))
+            with (
+                patch.object(ad, "PROJECT_ROOT", tmp),
+                patch.object(ad, "DARK_HORSES_DIR", os.path.join(tmp, "dh")),
+                patch.object(ad, "RISING_STARS_DIR", os.path.join(tmp, "rs")),
+                patch.object(ad, "get_current_week", return_value="2026_01"),
+            ):
+                saved = ad.save_products_batch(
+                    [
+                        {"name": "A", "website": "https://a.ai", "dark_horse_index": 4},
+                        {"name": "B", "website": "https://b.ai", "dark_horse_index": 3},
+                        {"name": "A2", "website": "https://www.a.ai/x", "dark_horse_index": 5},
+                    ]
+                )
+                self.assertEqual(saved, 3)
+                with open(os.path.join(tmp, "dh", "week_2026_01.json"), encoding="utf-8") as f:
+                    self.assertEqual([p["name"] for p in json.load(f)], ["A", "A2"])
+                with open(os.path.join(tmp, "rs", "global_2026_01.json"), encoding="utf-8") as f:
+                    self.assertEqual([p["name"] for p in json.load(f)], ["B"])
+                with open(os.path.join(tmp, "data", "products_featured.json"), encoding="utf-8") as f:
+                    # 最新的在前；同域名的 A2 不重复写入
+                    self.assertEqual([p["name"] for p in json.load(f)], ["B", "A"])
+
+    def test_duplicate_checker_similarity_requires_same_category(self) -> None:
+        from utils.dedup import DuplicateChecker
+
+        checker = DuplicateChecker([{"name": "Synthesia Studio", "category": "video"}])
+        is_dup, reason = checker.is_duplicate({"name": "Synthesia Studios", "category": "video"})
+        self.assertTrue(is_dup)
+        self.assertIn("名称相似", reason)
+        self.assertFalse(checker.is_duplicate({"name": "Synthesia Studios", "category": "coding"})[0])
+        self.assertFalse(checker.is_duplicate({"name": "Synthesia Studios"})[0])
+
+        # 同名产品换类别后，旧类别不再参与相似度匹配
+        checker.add_product({"name": "Synthesia Studio", "category": "coding"})
+        self.assertFalse(checker.is_duplicate({"name": "Synthesia Studios", "category": "video"})[0])
+        self.assertTrue(checker.is_duplicate({"name": "Synthesia Studios", "category": "coding"})[0])
+
+    def test_glm_cooldown_only_waits_for_remaining_delay(self) -> None:
+        import tools.auto_discover as ad
+
+        with (
+            patch.object(ad, "GLM_KEYWORD_DELAY", 3.0),
+            patch.object(ad, "_last_glm_keyword_at", 0.0),
+            patch.object(ad.time, "monotonic", side_effect=[100.0, 101.0, 200.0]),
+            patch.object(ad.time, "sleep") as sleep_mock,
+        ):
+            self.assertEqual(ad.wait_for_glm_cooldown(), 0.0)  # 第一个关键词不等待
+            ad.mark_glm_keyword_done()  # t=100
+            self.assertAlmostEqual(ad.wait_for_glm_cooldown(), 2.0)  # t=101，只补 2s
+            sleep_mock.assert_called_once_with(2.0)
+            self.assertEqual(ad.wait_for_glm_cooldown(), 0.0)  # t=200，早已冷却
+
+    def test_perplexity_search_batch_groups_and_falls_back(self) -> None:
+        import tools.auto_discover as ad
+        from utils.perplexity_client import PerplexityClient
+
+        client = PerplexityClient(api_key="test-key")
+        grouped_payload = {
+            "results": [
+                [{"title": "A", "url": "https://a.com", "snippet": "a"}],
+                [{"title": "B", "url": "https://b.com", "snippet": "b"}],
+            ]
+        }
+        with (
+            patch.object(ad, "get_perplexity_client", return_value=client),
+            patch.object(ad, "AUTO_DISCOVER_SEARCH_BATCH_SIZE", 5),
+            patch.object(client, "_post_search", return_value=grouped_payload) as post_mock,
+            patch.object(client, "_rate_limit"),
+        ):
+            out = ad.perplexity_search_batch(["q1", "q2"], region="us")
+        self.assertEqual(post_mock.call_count, 1)
+        self.assertEqual(post_mock.call_args[0][0]["query"], ["q1", "q2"])
+        self.assertEqual(out["q1"][0]["url"], "https://a.com")
+        self.assertEqual(out["q2"][0]["content"], "b")
+
+        # 响应没有按 query 分组时逐条回退
+        with (
+            patch.object(ad, "get_perplexity_client", return_value=client),
+            patch.object(ad, "AUTO_DISCOVER_SEARCH_BATCH_SIZE", 5),
+            patch.object(client, "_post_search", return_value={"results": [{"title": "flat"}]}),
+            patch.object(client, "_rate_limit"),
+            patch.object(ad, "perplexity_search", side_effect=lambda q, count=10, region=None: [{"q": q}]),
+        ):
+            out = ad.perplexity_search_batch(["q1", "q2"], region="us")
+        self.assertEqual(out, {"q1": [{"q": "q1"}], "q2": [{"q": "q2"}]})
+
+    def test_seen_url_cache_filters_previously_extracted_results(self) -> None:
+        import tools.auto_discover as ad
+        from utils.seen_url_cache import SeenUrlCache
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SeenUrlCache(os.path.join(tmp, "seen.sqlite"), ttl_days=30)
+            first = [
+                {"url": "https://www.example.com/news/a/?utm_source=x"},
+                {"url": "https://example.com/news/b"},
+            ]
+            ad.mark_search_results_seen(cache, first[:1], "rejected")
+            results = [{"url": "https://example.com/news/a"}, {"url": "https://example.com/news/b"}]
+            fresh = ad.filter_seen_search_results(cache, results)
+            self.assertEqual(fresh, [{"url": "https://example.com/news/b"}])
+
+            cache._conn.execute("UPDATE seen SET first_seen = 0")
+            self.assertEqual(cache.expire(), 1)
+            self.assertEqual(len(ad.filter_seen_search_results(cache, results)), 2)
+            cache.close()
+
+    def test_search_with_provider_memoizes_equivalent_queries(self) -> None:
+        import tools.auto_discover as ad
+
+        ad.clear_search_memo()
+        results = [{"title": "A", "url": "https://a.com", "content": "a"}]
+        with (
+            patch.object(ad, "get_provider_for_region", return_value="perplexity"),
+            patch.object(ad, "perplexity_search", return_value=results) as search_mock,
+        ):
+            first = ad.search_with_provider("AI  Startup Funding", "us")
+            second = ad.search_with_provider("ai startup funding ", "us")
+            reordered = ad.search_with_provider("Funding AI startup", "us")
+            ad.search_with_provider("ai startup funding", "eu")
+        ad.clear_search_memo()
+
+        self.assertEqual(first, results)
+        self.assertEqual(second, results)
+        self.assertEqual(reordered, results)
+        self.assertEqual(search_mock.call_count, 2)
+
+    def test_fresh_search_results_searches_deeper_when_page_mostly_seen(self) -> None:
+        import tools.auto_discover as ad
+        from utils.seen_url_cache import SeenUrlCache
+
+        first_page = [{"url": f"https://news.com/{i}"} for i in range(10)]
+        deeper_page = first_page + [{"url": f"https://news.com/{i}"} for i in range(10, 20)]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SeenUrlCache(os.path.join(tmp, "seen.sqlite"))
+            ad.mark_search_results_seen(cache, first_page[:9], "rejected")
+            with (
+                patch.object(ad, "get_provider_for_region", return_value="perplexity"),
+                patch.object(ad, "AUTO_DISCOVER_SEARCH_MAX_PAGES", 2),
+                patch.object(ad, "perplexity_search", return_value=deeper_page) as search_mock,
+            ):
+                fresh = ad.fresh_search_results(cache, "kw", "us", first_page)
+            cache.close()
+
+        search_mock.assert_called_once_with("kw", count=20, region="us")
+        self.assertEqual(len(fresh), 11)
+        self.assertEqual(fresh[0]["url"], "https://news.com/9")
+
+    def test_token_bucket_allows_burst_then_throttles(self) -> None:
+        from utils.rate_limiter import TokenBucket
+
+        bucket = TokenBucket(rate_per_sec=0.001, burst=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertEqual(TokenBucket(rate_per_sec=0, burst=1).acquire(), 0.0)
+
+    def test_release_process_lock_lets_next_run_acquire(self) -> None:
+        import tools.auto_discover as ad
+
+        with tempfile.TemporaryDirectory() as tmp:
+            lock_path = os.path.join(tmp, "auto_discover.lock")
+            _, acquired = ad.acquire_process_lock(lock_path)
+            self.assertTrue(acquired)
+            ad.release_process_lock()
+            handle, acquired_again = ad.acquire_process_lock(lock_path)
+            self.assertTrue(acquired_again)
+            ad.release_process_lock()
+            ad.release_process_lock()  # 未持锁时无操作
+
+    def test_prune_low_yield_keywords_skips_then_reprobes(self) -> None:
+        import tools.auto_discover as ad
+
+        stats = {
+            "keywords": {
+                "us": {
+                    "dead-1": {"searches": 6, "saved": 0},
+                    "dead-2": {"searches": 9, "saved": 0},
+                    "good": {"searches": 6, "saved": 2},
+                    "new-ish": {"searches": 1, "saved": 0},
+                }
+            }
+        }
+        keywords = ["dead-1", "good", "dead-2", "new-ish"]
+        with (
+            patch.object(ad, "AUTO_DISCOVER_PRUNE_MIN_SEARCHES", 5),
+            patch.object(ad, "AUTO_DISCOVER_PRUNE_KEEP_MIN", 2),
+        ):
+            kept = ad.prune_low_yield_keywords("us", keywords, stats)
+            self.assertEqual(kept, ["good", "new-ish"])
+            self.assertIn("skip_until", stats["keywords"]["us"]["dead-1"])
+
+            # 跳过期满后放行一次
+            stats["keywords"]["us"]["dead-1"]["skip_until"] = "2000-01-01"
+            kept = ad.prune_low_yield_keywords("us", keywords, stats)
+            self.assertEqual(kept, ["dead-1", "good", "new-ish"])
+            self.assertNotIn("skip_until", stats["keywords"]["us"]["dead-1"])
+
+            # 保底数量
+            kept = ad.prune_low_yield_keywords("us", ["dead-1", "dead-2", "good"], stats)
+            self.assertEqual(kept, ["good", "dead-1"])
+
+    def test_cached_llm_analyze_reuses_identical_prompt(self) -> None:
+        import tools.auto_discover as ad
+        from utils.llm_response_cache import LlmResponseCache
+
+        client = MagicMock()
+        client.model = "sonar"
+        client.analyze.side_effect = [[{"name": "Foo"}], [], [{"name": "Bar"}]]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LlmResponseCache(os.path.join(tmp, "llm.sqlite"), ttl_days=7)
+            with patch.object(ad, "get_llm_response_cache", return_value=cache):
+                first = ad.cached_llm_analyze("perplexity", client, "prompt-a")
+                again = ad.cached_llm_analyze("perplexity", client, "prompt-a")
+                # 空结果不缓存，下次重新请求
+                empty = ad.cached_llm_analyze("perplexity", client, "prompt-b")
+                retry = ad.cached_llm_analyze("perplexity", client, "prompt-b")
+            cache.close()
+
+        self.assertEqual(first, [{"name": "Foo"}])
+        self.assertEqual(again, [{"name": "Foo"}])
+        self.assertEqual(empty, [])
+        self.assertEqual(retry, [{"name": "Bar"}])
+        self.assertEqual(client.analyze.call_count, 3)
+
+    def test_load_existing_products_reparses_only_changed_files(self) -> None:
+        import json
+        import tools.auto_discover as ad
+
+        with tempfile.TemporaryDirectory() as tmp:
+            dark_dir = os.path.join(tmp, "dark_horses")
+            rising_dir = os.path.join(tmp, "rising_stars")
+            os.makedirs(dark_dir)
+            week_file = os.path.join(dark_dir, "week_2026_01.json")
+            with open(week_file, "w") as f:
+                json.dump([{"name": "Foo", "website": "https://foo.ai"}], f)
+
+            with (
+                patch.object(ad, "DARK_HORSES_DIR", dark_dir),
+                patch.object(ad, "RISING_STARS_DIR", rising_dir),
+            ):
+                ad._load_product_file_entries.cache_clear()
+                self.assertEqual(ad.load_existing_products(), {"foo", "https://foo.ai", "foo.ai"})
+                ad.load_existing_products()
+                self.assertEqual(ad._load_product_file_entries.cache_info().misses, 1)
+
+                with open(week_file, "w") as f:
+                    json.dump([{"name": "Bar", "website": "https://bar.ai"}], f)
+                os.utime(week_file, ns=(0, os.stat(week_file).st_mtime_ns + 10**9))
+                self.assertIn("bar", ad.load_existing_products())
+                self.assertEqual(ad.load_existing_domains(), {"bar.ai"})
+
+    def test_score_products_batch_maps_by_name_and_falls_back(self) -> None:
+        import tools.auto_discover as ad
+
+        products = [{"name": "Foo"}, {"name": "Bar"}, {"name": "Baz"}]
+        calls = []
+
+        def fake_analyze(content, task, region_key, region_flag="🇺🇸", **kwargs):
+            calls.append(task)
+            if task == "score_batch":
+                return [
+                    {"name": "bar", "dark_horse_index": 3, "reason": "r-bar"},
+                    {"name": "Foo", "dark_horse_index": 4},
+                ]
+            return {"dark_horse_index": 2, "reason": "single"}
+
+        with (
+            patch.object(ad, "AUTO_DISCOVER_SCORE_BATCH_SIZE", 10),
+            patch.object(ad, "analyze_with_provider", side_effect=fake_analyze),
+        ):
+            ad.score_products_batch(products, "us", "🇺🇸")
+
+        self.assertEqual(calls, ["score_batch", "score"])
+        self.assertEqual([p["dark_horse_index"] for p in products], [4, 3, 2])
+        self.assertEqual(products[1]["score_reason"], "r-bar")
+        self.assertEqual(products[2]["score_reason"], "single")
+
+    def test_score_products_batch_skips_fallback_when_batch_call_fails(self) -> None:
+        import tools.auto_discover as ad
+
+        products = [{"name": "Foo"}, {"name": "Bar"}, {"name": "Baz"}]
+        analyze = MagicMock(return_value={})
+
+        with (
+            patch.object(ad, "AUTO_DISCOVER_SCORE_BATCH_SIZE", 10),
+            patch.object(ad, "analyze_with_provider", analyze),
+        ):
+            ad.score_products_batch(products, "us", "🇺🇸")
+
+        self.assertEqual(analyze.call_count, 1)
+        self.assertTrue(all("dark_horse_index" not in p for p in products))
+
+    def test_analysis_messages_keep_static_rules_as_stable_prefix(self) -> None:
+        from prompts.analysis_prompts import get_analysis_messages
+
+        for region_key in ("us", "cn"):
+            system_a, user_a = get_analysis_messages(region_key, "RESULTS-A", 5, 10)
+            system_b, user_b = get_analysis_messages(region_key, "RESULTS-B", 1, 2)
+            self.assertEqual(system_a, system_b)
+            self.assertNotIn("RESULTS-A", system_a)
+            self.assertIn("RESULTS-A", user_a)
+            self.assertIn("RESULTS-B", user_b)
+            self.assertIn("10", user_a)
+
+    def test_is_duplicate_matches_name_variants_and_domain(self) -> None:
+        import tools.auto_discover as ad
+
+        existing = {"harvey ai", "https://harvey.ai"}
+        existing.update(ad.fuzzy_duplicate_keys("Harvey AI", "https://harvey.ai"))
+
+        self.assertTrue(ad.is_duplicate("Harvey", "https://other.com", existing))
+        self.assertTrue(ad.is_duplicate("Legal Copilot", "https://www.harvey.ai/", existing))
+        self.assertFalse(ad.is_duplicate("Legal Copilot", "https://www.harvey.ai/legal", existing))
+        self.assertFalse(ad.is_duplicate("Hervey Robotics", "https://hervey.io", existing))
+
+    def test_is_duplicate_keeps_products_on_same_host_apart(self) -> None:
+        import tools.auto_discover as ad
+
+        existing = {"orion", "https://about.meta.com/realitylabs/orion"}
+        existing.update(ad.fuzzy_duplicate_keys("Orion", "https://about.meta.com/realitylabs/orion"))
+        existing.update(ad.fuzzy_duplicate_keys("Llama", "https://www.llama.com"))
+
+        self.assertFalse(ad.is_duplicate("Ray-Ban Meta", "https://about.meta.com/ray-ban", existing))
+        self.assertTrue(ad.is_duplicate("Llama 4", "https://llama.com", existing))
+
+    def test_discover_by_region_keeps_results_unseen_when_extraction_fails(self) -> None:
+        import tools.auto_discover as ad
+
+        def fake_search(keyword, region_key, engine="bing"):
+            return [{
+                "title": f"{keyword} startup raised $10M funding",
+                "url": f"https://news.example.com/{abs(hash(keyword))}",
+                "content": f"The AI startup behind {keyword} launched its product after raising a Series A.",
+            }]
+
+        for extract_result, expected_marks in (({}, 0), ([], 1)):
+            with self.subTest(extract_result=extract_result):
+                mark_seen = MagicMock()
+                with (
+                    patch.object(ad, "search_with_provider", side_effect=fake_search),
+                    patch.object(ad, "analyze_with_provider", return_value=extract_result),
+                    patch.object(ad, "mark_search_results_seen", mark_seen),
+                    patch.object(ad, "save_products_batch", MagicMock(return_value=0)),
+                    patch.object(ad, "flush_keyword_yield_stats", MagicMock()),
+                    patch.object(ad, "ENABLE_DEMAND_SIGNALS", False),
+                    patch.object(ad, "AUTO_DISCOVER_ENABLE_ANALYZE_GATE", False),
+                    patch.object(ad, "AUTO_DISCOVER_SEARCH_BATCH_SIZE", 1),
+                    patch.object(ad, "MAX_KEYWORDS_DEFAULT", 2),
+                    patch.dict(ad.PROVIDER_AVAILABLE, {"perplexity": True}),
+                ):
+                    stats = ad.discover_by_region("us", dry_run=True)
+
+                self.assertEqual(stats["products_found"], 0)
+                self.assertEqual(mark_seen.call_count, expected_marks * 2)
+
+    def test_mark_unreachable_websites_checks_each_url_once(self) -> None:
+        import tools.auto_discover as ad
+
+        products = [
+            {"name": "A", "website": "https://a.ai"},
+            {"name": "A2", "website": "https://a.ai"},
+            {"name": "B", "website": "https://b.ai"},
+            {"name": "C", "website": "unknown"},
+        ]
+        with patch.object(ad, "verify_url_exists", side_effect=lambda url, timeout=5: url == "https://a.ai") as verify:
+            marked = ad.mark_unreachable_websites(products)
+
+        self.assertEqual(marked, 1)
+        self.assertEqual(sorted(call.args[0] for call in verify.call_args_list), ["https://a.ai", "https://b.ai"])
+        self.assertTrue(products[2]["needs_verification"])
+        self.assertNotIn("needs_verification", products[0])
+        self.assertNotIn("needs_verification", products[3])
+
+    def test_html_to_text_separates_adjacent_elements(self) -> None:
+        import tools.auto_discover as ad
+
+        raw = (
+            "<html><head><style>p{color:red}</style></head><body>"
+            "<ul><li>Foo</li><li>Bar</li></ul><p>Funding</p><p>$10M</p>"
+            "<script>var x = 1;</script></body></html>"
+        ).encode("utf-8")
+
+        self.assertEqual(ad.html_to_text(raw).strip(), "Foo Bar Funding $10M")
+        if ad.HAS_LXML:
+            with patch.object(ad, "HAS_LXML", False):
+                self.assertEqual(ad.html_to_text(raw).strip(), "Foo Bar Funding $10M")
+
+
+class TestDiscoverAllRegionsConcurrency(unittest.TestCase):
+    """Threaded region fan-out (AUTO_DISCOVER_REGION_WORKERS > 1) with stubbed search/LLM calls."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        _ensure_import_paths()
+
+    def setUp(self) -> None:
+        self.searches = []
+        self.searches_after_quota = 0
+        self.saved = 0
+        self.quota_total = 0
+        self.quota_reached = threading.Event()
+        self.lock = threading.Lock()
+        self.names = itertools.count()
+
+    def fake_search(self, keyword, region_key, engine="bing"):
+        with self.lock:
+            self.searches.append((region_key, keyword))
+            if self.quota_reached.is_set():
+                self.searches_after_quota += 1
+        time.sleep(0.02)
+        return [{
+            "title": f"{keyword} startup raised $10M funding",
+            "url": f"https://news.example.com/{region_key}/{abs(hash(keyword))}",
+            "content": f"The AI startup behind {keyword} launched its product after raising a Series A.",
+        }]
+
+    def fake_analyze(self, content, task, region_key, region_flag="", quota_remaining=None, **kwargs):
+        products = []
+        for score in (4, 4, 2, 2):
+            n = next(self.names)
+            products.append({
+                "name": f"Acme{n}",
+                "website": f"https://acme{n}.ai",
+                "description": "An AI agent for sales teams that automates outbound prospecting",
+                "why_matters": "Raised $10M Series A led by Sequoia, 500 paying teams in 3 months",
+                "dark_horse_index": score,
+                "criteria_met": ["funding_signal"] if score >= 4 else [],
+            })
+        return products
+
+    def count_saved(self, product, fallback_region_flag=""):
+        with self.lock:
+            self.saved += 1
+            if self.saved >= self.quota_total:
+                self.quota_reached.set()
+
+    def discovery_patches(self, ad, stack: ExitStack, **overrides) -> MagicMock:
+        tmp = stack.enter_context(tempfile.TemporaryDirectory())
+        save_batch = MagicMock(return_value=0)
+        settings = {
+            "search_with_provider": self.fake_search,
+            "analyze_with_provider": self.fake_analyze,
+            "apply_country_fields": self.count_saved,
+            "save_products_batch": save_batch,
+            "flush_keyword_yield_stats": MagicMock(),
+            "try_recover_unknown_website": MagicMock(return_value=False),
+            "KEYWORD_YIELD_STATS_FILE": os.path.join(tmp, "keyword_yield_stats.json"),
+            "ENABLE_DEMAND_SIGNALS": False,
+            "AUTO_DISCOVER_ENABLE_ANALYZE_GATE": False,
+            "AUTO_DISCOVER_SEARCH_BATCH_SIZE": 1,
+            "AUTO_DISCOVER_REGION_WORKERS": len(ad.REGION_CONFIG),
+            "AUTO_DISCOVER_KEYWORD_WORKERS": 2,
+            "AUTO_DISCOVER_ROUND1_KEYWORDS": 6,
+            "GLM_KEYWORD_DELAY": 0,
+        }
+        settings.update(overrides)
+        for name, value in settings.items():
+            stack.enter_context(patch.object(ad, name, value))
+        stack.enter_context(patch.dict(ad.PROVIDER_AVAILABLE, {"perplexity": True, "glm": False}))
+        self.quota_total = sum(ad.DAILY_QUOTA.values())
+        return save_batch
+
+    def test_quotas_and_region_caps_hold_under_concurrent_regions(self) -> None:
+        import tools.auto_discover as ad
+
+        threads_before = threading.active_count()
+        with ExitStack() as stack:
+            self.discovery_patches(ad, stack)
+            report = ad.discover_all_regions(dry_run=True)
+
+        self.assertEqual(report["found"], ad.DAILY_QUOTA)
+        for region_key, count in report["region_yield"].items():
+            self.assertLessEqual(count, ad.REGION_MAX.get(region_key, 3))
+        self.assertEqual(threading.active_count(), threads_before)
+
+    def test_workers_stop_taking_keywords_once_quotas_are_met(self) -> None:
+        import tools.auto_discover as ad
+
+        quota = {"dark_horses": 2, "rising_stars": 2}
+        with ExitStack() as stack:
+            self.discovery_patches(ad, stack, DAILY_QUOTA=quota)
+            report = ad.discover_all_regions(dry_run=True)
+
+        self.assertEqual(report["found"], quota)
+        planned = len(ad.REGION_CONFIG) * 6
+        in_flight = len(ad.REGION_CONFIG) * 2
+        self.assertLess(len(self.searches), planned)
+        self.assertLessEqual(self.searches_after_quota, in_flight)
+
+    def test_commit_error_still_saves_buffer_and_does_not_hang(self) -> None:
+        import tools.auto_discover as ad
+
+        attach_calls = itertools.count(1)
+
+        def flaky_attach(product, search_results, min_score=4):
+            if next(attach_calls) > 4:
+                raise RuntimeError("boom")
+
+        errors = []
+        threads_before = threading.active_count()
+        with ExitStack() as stack:
+            save_batch = self.discovery_patches(ad, stack, attach_source_url=flaky_attach)
+
+            def run() -> None:
+                try:
+                    ad.discover_all_regions(dry_run=True)
+                except RuntimeError as e:
+                    errors.append(e)
+
+            runner = threading.Thread(target=run, daemon=True)
+            runner.start()
+            runner.join(timeout=30)
+            self.assertFalse(runner.is_alive())
+
+        self.assertEqual(len(errors), 1)
+        save_batch.assert_called_once()
+        buffered, dry_run = save_batch.call_args.args
+        self.assertTrue(dry_run)
+        self.assertEqual(len(buffered), self.saved)
+        self.assertLess(len(self.searches), len(ad.REGION_CONFIG) * 6)
+        self.assertEqual(threading.active_count(), threads_before)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -142,6 +142,14 @@ class TestGLMWebSearchAPI(unittest.TestCase):
         results = client.search("test")
         self.assertEqual(results, [])
 
+    def test_extract_json_salvages_trailing_commas_and_prose(self) -> None:
+        """Trailing commas and surrounding prose no longer discard the whole response."""
+        client = self._make_client()
+        text = 'Here are the products:\n[{"name": "Foo", "score": 4,},]\nHope this helps.'
+
+        self.assertEqual(client._extract_json(text), [{"name": "Foo", "score": 4}])
+        self.assertEqual(client._extract_json("no json here"), [])
+
     def test_payload_uses_correct_engine(self) -> None:
         """Verify the POST payload includes the specified search engine."""
         client = self._make_client()